@@ -4,6 +4,7 @@ import argparse
 import sys
 from contextlib import suppress
 from textwrap import dedent
+from typing import Any
 from typing import Literal
 from typing import overload
 from typing import TYPE_CHECKING
@@ -39,7 +40,7 @@ class CLIApp(Protocol):
             if field in ("COMMAND_NAME", "ADD_HELP", "ARG_HELP"):
                 continue
             ztype = str(ztype_)
-            kwargs = {
+            kwargs: dict[str, Any] = {
                 "help": cls.ARG_HELP.get(field),
             }
 
@@ -48,6 +49,8 @@ class CLIApp(Protocol):
                 kwargs["nargs"] = "+"
             if ztype == "bool":
                 kwargs["action"] = "store_true"
+            if ztype.replace(" | None", "") in ("int", "float"):
+                kwargs["type"] = int if ztype.startswith("int") else float
             if hasattr(cls, field):
                 kwargs["default"] = getattr(cls, field)
                 field_arg = f'--{field.replace("_", "-")}'
@@ -55,7 +58,7 @@ class CLIApp(Protocol):
                 field_arg = f'--{field.replace("_", "-")}'
             if "Literal" in ztype:
                 kwargs["choices"] = eval(ztype.split("Literal")[1].split("[")[1].split("]")[0])  # noqa: S307, PGH001
-            parser.add_argument(field_arg, **kwargs)  # type:ignore
+            parser.add_argument(field_arg, **kwargs)
         return parser
 
     @overload
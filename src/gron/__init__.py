@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
-# flake8: noqa: PLR0912
 from __future__ import annotations
 
+import json
+import math
+import random
 import re
+from itertools import islice
+from json.encoder import encode_basestring  # type: ignore[attr-defined, unused-ignore]
 from typing import Any
 from typing import TYPE_CHECKING
 from typing import Union
@@ -10,90 +14,472 @@ from typing import Union
 from typing_extensions import TypeAlias
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from collections.abc import Sequence
     from collections.abc import Iterable
     from collections.abc import Generator
+    from collections.abc import Iterator
+    from gron.path_filter import PathFilter
+    from gron.path_filter import State
 
 
 JSON_TYPE: TypeAlias = Union[str, int, float, bool, None, list[Any], dict[str, Any]]
 
 
-def _gron_helper(obj: JSON_TYPE, path: str = "json") -> Generator[tuple[str, str], None, None]:
+def _key_segment(key: str) -> str:
+    return f".{key}" if key.isalnum() else f"[{encode_basestring(key)}]"
+
+
+def _scalar_value(obj: JSON_TYPE) -> str:
+    if isinstance(obj, bool):
+        return "true" if obj else "false"
+    if obj is None:
+        return "null"
+    if isinstance(obj, str):
+        return encode_basestring(obj)
+    if isinstance(obj, float) and not math.isfinite(obj):
+        # Spelled as json.dumps does, which json.loads (and so ungron) reads back.
+        return "NaN" if math.isnan(obj) else ("Infinity" if obj > 0 else "-Infinity")
+    return str(obj)
+
+
+def _children(obj: dict[str, Any] | list[Any]) -> Iterator[tuple[str | int, JSON_TYPE]]:
+    return iter(sorted(obj.items()) if isinstance(obj, dict) else enumerate(obj))
+
+
+def _segment(key: str | int) -> str:
+    return f"[{key}]" if isinstance(key, int) else _key_segment(key)
+
+
+def _json_segment(key: str | int) -> str:
+    return f",{key}" if isinstance(key, int) else f",{encode_basestring(key)}"
+
+
+def _rendered(obj: JSON_TYPE) -> str:
     if isinstance(obj, dict):
-        yield path, "{}"
-        for key, value in obj.items():
-            _key = f".{key}" if key.isalnum() else f'["{key}"]'
-            yield from _gron_helper(value, f"{path}{_key}")
-    elif isinstance(obj, list):
-        yield path, "[]"
-        for i, value in enumerate(obj):
-            yield from _gron_helper(value, f"{path}[{i}]")
-    elif isinstance(obj, bool):
-        yield path, "true" if obj else "false"
-    elif obj is None:
-        yield path, "null"
-    elif isinstance(obj, str):
-        yield path, f'"{obj}"'
+        return "{}"
+    if isinstance(obj, list):
+        return "[]"
+    return _scalar_value(obj)
+
+
+def _walk(  # noqa: C901, PLR0913
+    obj: JSON_TYPE,
+    path: str = "json",
+    *,
+    path_filter: PathFilter | None = None,
+    segment: Callable[[str | int], str] = _segment,
+    children: Callable[[dict[str, Any] | list[Any]], Iterator[tuple[str | int, JSON_TYPE]]] = (
+        _children
+    ),
+    enter: Callable[[dict[str, Any] | list[Any], int], bool] | None = None,
+) -> Generator[tuple[str, JSON_TYPE], None, None]:
+    """
+    Yield ``(path, value)`` for ``obj`` and every node below it, in canonical order.
+
+    An explicit stack of child iterators replaces recursion, so depth is unbounded. The path is
+    kept as a list of ``segment`` strings and only joined when a container is entered or resumed.
+    ``children`` lists the children of a container that are visited, and a container at depth
+    ``d`` is only entered if ``enter(container, d)`` holds. With ``path_filter`` each container
+    carries its filter state: only matching paths are yielded and subtrees that cannot match are
+    skipped.
+    """
+    state = path_filter.start(path) if path_filter is not None else None
+    if path_filter is not None:
+        if state is None:
+            return
+        if path_filter.matches(state, path):
+            yield path, obj
     else:
-        yield path, str(obj)
+        yield path, obj
+    if not isinstance(obj, (dict, list)) or (enter is not None and not enter(obj, 0)):
+        return
+    segments = [path]
+    stack: list[tuple[Iterator[tuple[str | int, JSON_TYPE]], State]] = [(children(obj), state)]
+    while stack:
+        prefix = "".join(segments)
+        items, parent_state = stack[-1]
+        for key, value in items:
+            if path_filter is not None:
+                state = path_filter.step(parent_state, key)
+                if state is None:
+                    continue
+            child = segment(key)
+            if path_filter is None or path_filter.matches(state, prefix + child):
+                yield prefix + child, value
+            if isinstance(value, (dict, list)) and (enter is None or enter(value, len(stack))):
+                segments.append(child)
+                stack.append((children(value), state))
+                break
+        else:
+            stack.pop()
+            segments.pop()
+
+
+def _gron_helper(
+    obj: JSON_TYPE,
+    path: str = "json",
+    path_filter: PathFilter | None = None,
+) -> Generator[tuple[str, str], None, None]:
+    for node_path, value in _walk(obj, path, path_filter=path_filter):
+        yield node_path, _rendered(value)
+
+
+def iter_gron_limited(
+    obj: JSON_TYPE,
+    *,
+    max_depth: int | None = None,
+    max_items: int | None = None,
+    sample: int | None = None,
+    seed: int | None = None,
+) -> Generator[str, None, None]:
+    """
+    Gron the top of ``obj`` in canonical order without visiting the parts left out.
+
+    Containers ``max_depth`` levels below the root are printed as ``{}``/``[]``. Arrays keep their
+    first ``max_items`` elements, or a uniform random ``sample`` of that many (seeded with
+    ``seed``); elements keep their original index.
+    """
+    rng = random.Random(seed)  # noqa: S311
+
+    def children(value: dict[str, Any] | list[Any]) -> Iterator[tuple[str | int, JSON_TYPE]]:
+        if isinstance(value, dict):
+            return iter(sorted(value.items()))
+        if sample is not None and sample < len(value):
+            return iter([(i, value[i]) for i in sorted(rng.sample(range(len(value)), sample))])
+        return islice(enumerate(value), max_items)
+
+    walk = _walk(
+        obj,
+        children=children,
+        enter=None if max_depth is None else lambda _, depth: depth < max_depth,
+    )
+    for path, value in walk:
+        yield f"{path} = {_rendered(value)};"
+
+
+def iter_gron(
+    obj: JSON_TYPE,
+    path_filter: PathFilter | None = None,
+) -> Generator[str, None, None]:
+    """Yield gron lines in canonical order: keys sorted per object, array indices in order."""
+    for path, value in _walk(obj, path_filter=path_filter):
+        yield f"{path} = {_rendered(value)};"
 
 
 def gron(obj: JSON_TYPE) -> list[str]:
-    return sorted(f"{path} = {value};" for path, value in _gron_helper(obj))
-
-
-def _ungron_helper(data: Sequence[tuple[str, str]], _walker: int = 0) -> tuple[JSON_TYPE, int]:  # noqa: C901, PLR0911
-    (head_path, head_value) = data[_walker]
-    if head_value == "[]":
-        ret: list[Any] = []
-        pattern = re.escape(head_path) + r"\[(\d+)\]"
-        _walker += 1
-        while _walker < len(data):
-            (path, value) = data[_walker]
-            pattern_match = re.match(pattern, path)
-            if pattern_match:
-                index = int(pattern_match.group(1))
-                d, _walker = _ungron_helper(data, _walker)
-                ret.insert(index, d)
-            else:
-                break
-        return ret, _walker
-    if head_value == "{}":
-        ret_dict = {}
-        pattern_base = re.escape(head_path)
-        _walker += 1
-        while _walker < len(data):
-            (path, value) = data[_walker]
-            pattern_match = re.match(
-                pattern_base + r"\.(\w+)",
-                path,
-            ) or re.match(pattern_base + r'\["(.+?)"\]', path)
-            if pattern_match:
-                key = pattern_match.group(1)
-                d, _walker = _ungron_helper(data, _walker)
-                ret_dict[key] = d
+    return list(iter_gron(obj))
+
+
+def iter_gron_json(
+    obj: JSON_TYPE,
+    path_filter: PathFilter | None = None,
+) -> Generator[str, None, None]:
+    """
+    Yield the JSON-stream form of the gron lines: ``[["a",0,"b"],value]`` per line.
+
+    The keys exclude the root name. Every line decodes with ``json.loads`` and ungron reads it back.
+    """
+    if path_filter is not None:
+        for path, value in _walk(obj, path_filter=path_filter):
+            yield f"[{_json_keys(path)},{_rendered(value)}]"
+        return
+    # The path is rendered directly as the keys of the JSON array: segments are ',"key"' or ',0'
+    # and the leading comma is dropped.
+    for path, value in _walk(obj, "", segment=_json_segment):
+        yield f"[[{path[1:]}],{_rendered(value)}]"
+
+
+_SEGMENT_PATTERN = r'\.[^.\[\s]+|\[\d+\]|\["(?:[^"\\]|\\.)*"\]'
+_ROOT = re.compile(r"[A-Za-z_$][\w$]*")
+_SEGMENT = re.compile(r'\.([^.\[\s]+)|\[(\d+)\]|\[("(?:[^"\\]|\\.)*")\]')
+_LINE = re.compile(
+    rf"\s*(?P<path>(?P<parent>[A-Za-z_$][\w$]*(?:{_SEGMENT_PATTERN})*)(?P<last>{_SEGMENT_PATTERN})"
+    rf"|[A-Za-z_$][\w$]*) = (?P<value>.*);\s*"
+)
+_ELEMENT = re.compile(r"\s*([A-Za-z_$][\w$]*)\[(\d+)\]")
+_ROOT_ARRAY = re.compile(r"\s*[A-Za-z_$][\w$]* = \[\];\s*")
+_INT = re.compile(r"-?(?:0|[1-9][0-9]*)")
+_CONSTANTS: dict[str, JSON_TYPE] = {"true": True, "false": False, "null": None}
+# raw_decode skips the whitespace checks of json.loads; JSON-stream lines start with "[".
+_decode_json_line = json.JSONDecoder().raw_decode
+
+
+def _decode_string(text: str) -> str:
+    if "\\" not in text:
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        # Older gron() output did not escape strings, so fall back to the raw text.
+        return text[1:-1]
+
+
+def _parse_value(text: str) -> JSON_TYPE:
+    if text == "{}":
+        return {}
+    if text == "[]":
+        return []
+    if text in _CONSTANTS:
+        return _CONSTANTS[text]
+    if text.startswith('"'):
+        return _decode_string(text)
+    if _INT.fullmatch(text):
+        return int(text)
+    return json.loads(text)
+
+
+def _parse_segment(segment: str) -> str | int:
+    if segment[0] == ".":
+        return segment[1:]
+    if segment[1] == '"':
+        return _decode_string(segment[1:-1])
+    return int(segment[1:-1])
+
+
+def _path_keys(path: str) -> list[str | int]:
+    """Keys of a rendered gron path (str for objects, int for arrays), without the root name."""
+    return [
+        name or (int(index) if index else _decode_string(quoted))  # type: ignore[misc, unused-ignore]
+        for name, index, quoted in _SEGMENT.findall(path)
+    ]
+
+
+def _parse_gron_line(line: str) -> tuple[list[str | int], JSON_TYPE]:
+    """Split ``path = value;`` into the path keys (str for objects, int for arrays) and value."""
+    match = _LINE.fullmatch(line)
+    if not match:
+        msg = f"Invalid gron line: {line.strip()!r}"
+        raise ValueError(msg)
+    return _path_keys(match["path"]), _parse_value(match["value"])
+
+
+def _json_keys(path: str) -> str:
+    return json.dumps(_path_keys(path), separators=(",", ":"), ensure_ascii=False)
+
+
+def gron_to_json(line: str) -> str:
+    """Convert one ``path = value;`` line to the JSON-stream form of ``iter_gron_json``."""
+    match = _LINE.fullmatch(line)
+    if match is None:
+        msg = f"Invalid gron line: {line.strip()!r}"
+        raise ValueError(msg)
+    return f"[{_json_keys(match['path'])},{match['value']}]"
+
+
+def _shared_prefix_length(a: str, b: str) -> int:
+    # Binary search over slice comparisons, which run in C, instead of a loop per character.
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def front_code(lines: Iterable[str]) -> Generator[str, None, None]:
+    """
+    Prefix-compress gron lines: each line is written as ``<n> <rest>``.
+
+    ``n`` is the number of leading characters shared with the previous line.
+    ``expand_front_coded`` reverses it.
+    """
+    previous = ""
+    for line in lines:
+        n = _shared_prefix_length(previous, line)
+        yield f"{n} {line[n:]}"
+        previous = line
+
+
+def expand_front_coded(lines: Iterable[str]) -> Generator[str, None, None]:
+    """Expand ``front_code`` output; other lines (plain gron, JSON-stream) pass through."""
+    previous = ""
+    for line in lines:
+        if line[:1].isdigit():
+            n, _, rest = line.rstrip("\r\n").partition(" ")
+            line = previous[: int(n)] + rest  # noqa: PLW2901
+        previous = line
+        yield line
+
+
+class MissingParentError(ValueError):
+    """A gron line assigns below a container that no earlier line created (see ``merge``)."""
+
+
+class _UngronTree:
+    """
+    JSON value being rebuilt from gron lines.
+
+    Containers are indexed by their path text as they are declared, so a line only parses its last
+    path segment and finds its parent with one lookup; lines whose parent is not indexed walk the
+    tree from the root. With ``merge`` missing parents are created on the way, so lines may come
+    in any order and from several partial sources.
+    """
+
+    def __init__(self, *, merge: bool = False) -> None:
+        self.merge = merge
+        self.holder: list[Any] = [None]
+        self.containers: dict[str | tuple[str | int, ...], Any] = {}
+        self.empty = True
+
+    @property
+    def root(self) -> JSON_TYPE:
+        if self.empty:
+            msg = "No gron lines to ungron"
+            raise ValueError(msg)
+        return self.holder[0]  # type: ignore[no-any-return, unused-ignore]
+
+    def _set(self, container: Any, key: str | int, value: JSON_TYPE) -> JSON_TYPE:  # noqa: ANN401
+        """Store ``value`` at ``container[key]`` and return the node now stored there."""
+        if isinstance(container, list):
+            if key >= len(container):  # type: ignore[operator]
+                # Sparse (or lexically ordered: json[10] before json[2]) indices are padded.
+                container.extend([None] * (key - len(container) + 1))  # type: ignore[operator]
+        elif key not in container:
+            container[key] = value
+            return value
+        existing = container[key]
+        if isinstance(value, (dict, list)) and type(existing) is type(value):
+            # Keep children already assigned to a repeated container declaration.
+            return existing  # type: ignore[no-any-return, unused-ignore]
+        if isinstance(existing, (dict, list)):
+            # Indexed paths below the replaced container now point into a detached subtree.
+            self.containers.clear()
+        container[key] = value
+        return value
+
+    def _walk(self, keys: Sequence[str | int]) -> tuple[Any, str | int]:
+        container: Any = self.holder
+        key: str | int = 0
+        for next_key in keys:
+            if isinstance(container, dict):
+                node = container.get(key)
             else:
-                break
-        return ret_dict, _walker
-    if head_value == "true":
-        return True, _walker + 1
-    if head_value == "false":
-        return False, _walker + 1
-    if head_value == "null":
-        return None, _walker + 1
-    if head_value.startswith('"'):
-        return head_value[1:-1], _walker + 1
-    if head_value.isnumeric():
-        return int(head_value), _walker + 1
-
-    return float(head_value), _walker + 1
-
-
-def ungron(lines: Iterable[str]) -> JSON_TYPE:
-    result, _ = _ungron_helper(
-        [
-            line.strip().rstrip(";").split(" = ", maxsplit=1)  # type: ignore
-            for line in lines
-        ]
-    )
-    return result
+                node = container[key] if key < len(container) else None  # type: ignore[operator]
+            if not isinstance(node, list if isinstance(next_key, int) else dict):
+                if not self.merge:
+                    msg = f"Missing parent for {keys!r}"
+                    raise MissingParentError(msg)
+                node = self._set(container, key, [] if isinstance(next_key, int) else {})
+            container, key = node, next_key
+        return container, key
+
+    def add_keys(self, keys: Sequence[str | int], value: JSON_TYPE) -> None:
+        """Store ``value`` at the path ``keys`` (without the root name)."""
+        self.empty = False
+        container: Any
+        key: str | int
+        if not keys:
+            container, key = self.holder, 0
+        else:
+            # Containers from JSON-stream lines are indexed by their keys tuple.
+            key = keys[-1]
+            container = self.containers.get(tuple(keys[:-1]))
+            if not isinstance(container, list if isinstance(key, int) else dict):
+                container, key = self._walk(keys)
+        node = self._set(container, key, value)
+        if isinstance(node, (dict, list)):
+            self.containers[tuple(keys)] = node
+
+    def add(self, line: str) -> None:
+        if line.startswith("["):
+            # JSON-stream line from iter_gron_json.
+            self.add_keys(*_decode_json_line(line)[0])
+            return
+        match = _LINE.fullmatch(line)
+        if match is None:
+            if line.isspace() or not line:
+                return
+            msg = f"Invalid gron line: {line.strip()!r}"
+            raise ValueError(msg)
+        self.empty = False
+        path, parent, last, text = match.groups()
+        value = _parse_value(text)
+        container: Any
+        key: str | int
+        if last is None:
+            container, key = self.holder, 0
+        else:
+            key = _parse_segment(last)
+            container = self.containers.get(parent)
+            if not isinstance(container, list if isinstance(key, int) else dict):
+                container, key = self._walk(_parse_gron_line(line)[0])
+        node = self._set(container, key, value)
+        if isinstance(node, (dict, list)):
+            self.containers[path] = node
+
+
+def ungron(lines: Iterable[str], *, merge: bool = False) -> JSON_TYPE:
+    """
+    Rebuild the JSON value from gron lines in a single pass.
+
+    By default parents must be declared (``= {};`` / ``= [];``) before their children. With
+    ``merge`` the lines may come in any order, be a filtered subset (``gron | grep | ungron``) or
+    span several shards: missing parents are created and sparse array indices are padded with null.
+    Lines in the JSON-stream form of ``iter_gron_json`` and front-coded lines are read too.
+    """
+    tree = _UngronTree(merge=merge)
+    for line in expand_front_coded(lines):
+        tree.add(line)
+    return tree.root
+
+
+def _split_element(line: str) -> tuple[int, str | tuple[list[str | int], JSON_TYPE]] | None:
+    """
+    Split ``line`` by the top-level array element it belongs to.
+
+    Returns the element index and the line rebased on that element (gron text, or the keys and
+    value of a JSON-stream line), or None for lines to skip.
+    """
+    if line.startswith("["):
+        keys, value = _decode_json_line(line)[0]
+        if keys and isinstance(keys[0], int) and not isinstance(keys[0], bool):
+            return keys[0], (keys[1:], value)
+        if not keys and value == []:
+            return None
+    else:
+        match = _ELEMENT.match(line)
+        if match is not None:
+            return int(match[2]), match[1] + line[match.end() :]
+        if line.isspace() or not line or _ROOT_ARRAY.fullmatch(line):
+            return None
+    msg = f"Expected a line of a top-level array element: {line.strip()!r}"
+    raise ValueError(msg)
+
+
+def ungron_elements(
+    lines: Iterable[str],
+    *,
+    merge: bool = False,
+) -> Generator[JSON_TYPE, None, None]:
+    """
+    Ungron a top-level array one element at a time.
+
+    Each element is yielded as soon as a line for a higher index arrives, so only one element is
+    held in memory. Lines of an element must be contiguous and indices must increase, as in
+    canonical gron output; lexically sorted output (0, 1, 10, 2, ...) raises ValueError instead of
+    reordering the elements. Missing indices are skipped.
+    """
+    tree = _UngronTree(merge=merge)
+    current = -1
+    for line in expand_front_coded(lines):
+        element = _split_element(line)
+        if element is None:
+            continue
+        index, rest = element
+        if index != current:
+            if index < current:
+                msg = f"Element {index} after element {current}: input not in canonical order"
+                raise ValueError(msg)
+            if not tree.empty:
+                yield tree.root
+                tree = _UngronTree(merge=merge)
+            current = index
+        if isinstance(rest, str):
+            tree.add(rest)
+        else:
+            tree.add_keys(*rest)
+    if not tree.empty:
+        yield tree.root
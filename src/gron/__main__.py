@@ -1,14 +1,163 @@
 from __future__ import annotations
 
 import json
+import os
+import stat
+import sys
+from contextlib import suppress
+from typing import Literal
 from typing import TYPE_CHECKING
 
 from comma.simple_argparser import CLIApp
-from gron import gron
+from gron import _scalar_value
+from gron import expand_front_coded
+from gron import front_code
+from gron import gron_to_json
+from gron import iter_gron
+from gron import iter_gron_json
+from gron import iter_gron_limited
+from gron import MissingParentError
 from gron import ungron
+from gron import ungron_elements
+from gron.backends import load
+from gron.backends import loads_function
+from gron.backends import select_backend
+from gron.columnar import iter_columnar
+from gron.compression import open_input
+from gron.diff import diff_gron
+from gron.external_sort import DEFAULT_BUFFER_SIZE
+from gron.external_sort import DEFAULT_RUN_LINES
+from gron.external_sort import external_sort
+from gron.index import GronIndex
+from gron.index import index_json
+from gron.parallel import gron_files
+from gron.parallel import gron_ndjson
+from gron.patch import apply_patch
+from gron.path_filter import PathFilter
+from gron.stats import ndjson_stats
+from gron.stats import SchemaStats
+from gron.stream import JSONEventReader
+from gron.stream import stream_gron
+from gron.watch import DEFAULT_INTERVAL
+from gron.watch import watch_gron
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
     from collections.abc import Sequence
+    from typing import IO
+    from gron import JSON_TYPE
+
+
+def _read_lines(filenames: Iterable[str]) -> Generator[str, None, None]:
+    for filename in filenames:
+        with open_input(filename) as f:
+            yield from f
+
+
+OUTPUT_BLOCK_SIZE = 1024 * 1024
+
+
+def _write_lines(lines: Iterable[str], *, flush_each: bool = False) -> int:
+    """
+    Write ``lines`` to stdout in blocks of about OUTPUT_BLOCK_SIZE characters and return how many.
+
+    Each block is joined and encoded once. With ``flush_each`` every line is written as soon as it
+    is produced instead, for input that arrives slowly. A closed downstream pipe
+    (``gron big.json | head``) ends the program quietly.
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    encoding, errors = sys.stdout.encoding, sys.stdout.errors or "strict"
+    block_size = 0 if flush_each else OUTPUT_BLOCK_SIZE
+    block: list[str] = []
+    size = count = 0
+    try:
+        for line in lines:
+            block.append(line)
+            size += len(line) + 1
+            if size >= block_size:
+                block.append("")
+                out.write("\n".join(block).encode(encoding, errors))
+                if flush_each:
+                    out.flush()
+                count += len(block) - 1
+                block, size = [], 0
+        block.append("")
+        out.write("\n".join(block).encode(encoding, errors))
+        count += len(block) - 1
+        out.flush()
+    except BrokenPipeError:
+        # Python would report the error again when flushing stdout at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        raise SystemExit(1) from None
+    return count
+
+
+def _is_pipe(filename: str) -> bool:
+    # Pipes and terminals deliver input while it is produced, so output should keep up with it.
+    try:
+        return not stat.S_ISREG(os.stat(filename).st_mode)
+    except OSError:
+        return False
+
+
+_JSON_SUFFIXES = (".json", ".json.gz", ".json.bz2", ".json.xz")
+
+
+def _json_files(paths: Iterable[str]) -> Generator[str, None, None]:
+    # Directories are searched recursively in sorted order, so the output order is stable.
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(_JSON_SUFFIXES):
+                    yield os.path.join(root, name)
+
+
+def _sort_lines(lines: Iterable[str], args: Gron) -> Iterable[str]:
+    if args.sort == "lexical":
+        return sorted(lines)
+    if args.sort == "external":
+        return external_sort(
+            lines,
+            buffer_size=args.sort_buffer_size,
+            run_lines=args.sort_run_lines,
+        )
+    return lines
+
+
+def _input_size(filename: str) -> int:
+    # Pipes report 0; stdin redirected from a file reports the file size.
+    try:
+        return os.stat(filename).st_size
+    except OSError:
+        return 0
+
+
+def _load_json(filename: str, backend: str) -> JSON_TYPE:
+    with open_input(filename) as f:
+        return load(f, backend)
+
+
+def _path_filter(pattern: str | None) -> PathFilter | None:
+    return PathFilter(pattern) if pattern else None
+
+
+def _find_lines(index: GronIndex, text: str) -> Generator[str, None, None]:
+    # abc123 is looked up as a string; 42, true or "42" are also tried as the JSON they spell.
+    # An ordered dict, not a set, so the output does not depend on the hash seed.
+    candidates = dict.fromkeys([_scalar_value(text)])
+    with suppress(ValueError):
+        value = json.loads(text)
+        if not isinstance(value, (dict, list)):
+            candidates[_scalar_value(value)] = None
+    for value in candidates:
+        for path in index.find(value):
+            yield f"{path} = {value};"
 
 
 class Gron(CLIApp):
@@ -16,32 +165,383 @@ class Gron(CLIApp):
 
     COMMAND_NAME = "gron"
     ARG_HELP = {  # noqa: RUF012
-        "file": "File to read from. Defaults to stdin.",
+        "file": (
+            "Files to read from, optionally gzip, bzip2 or xz compressed. Defaults to stdin."
+            " Several files or directories (searched for *.json files) are read in parallel and"
+            " each line is prefixed with its file name; files that fail are reported on stderr"
+            " and give exit status 2."
+        ),
         "ungron": "Ungron the input.",
+        "merge": (
+            "Ungron lines in any order, creating missing parents, and merge every --file into"
+            " one document."
+        ),
+        "ndjson": (
+            "Read JSON Lines and gron record n under json[n], in parallel. With --ungron, write"
+            " each top-level array element as one JSON line as soon as all of its lines are read;"
+            " the input must be in canonical order, not --sort lexical."
+        ),
+        "path": (
+            "Only output paths matching this glob (json.items[*].id, .** for any depth) or, if it"
+            " is not a glob, this regular expression. Globs skip subtrees that cannot match."
+        ),
+        "query": (
+            "Print the subtree at this exact path (json.meta.version) and stop reading the input"
+            " as soon as it is complete."
+        ),
+        "index": "Write a binary path index of the input to this file. With --lookup, read it.",
+        "lookup": "Print the subtree at this exact path from the --index file.",
+        "values": "With --index, also write an inverted index from scalar values to paths.",
+        "find": (
+            "Print the lines whose value is this scalar (abc123, 42, true) using the inverted"
+            " index next to --index."
+        ),
+        "diff": (
+            "Compare two JSON files and print the gron lines only in the first (-) or only in the"
+            " second (+); a changed value prints both. Exits with 1 if they differ. Both files are"
+            " loaded into memory; only their gron lines are compared as a stream."
+        ),
+        "backend": (
+            "JSON parser. auto (or the GRON_BACKEND environment variable) uses orjson when it is"
+            " installed, else the standard library, and the streaming parser for inputs of 1 GiB"
+            " or more when the output is sorted afterwards."
+        ),
+        "apply": (
+            "Apply a gron patch to a JSON file and print the result: PATCH TARGET. Lines assign"
+            " (path = value;), lines starting with - delete. gron --diff output is a valid patch."
+        ),
+        "watch": (
+            "Gron this file, then poll it and print only the lines removed (-) or added (+) each"
+            " time it is rewritten."
+        ),
+        "watch_interval": "Seconds between two polls of the --watch file.",
+        "stats": (
+            "Print per path template (array indices as [*]) the value count, types, nulls and"
+            " min..max length (of strings, arrays and objects), in one streaming pass."
+        ),
+        "templates": (
+            "Print each path template (array indices as [*]) with its number of lines and value"
+            " types, most frequent first, in one streaming pass."
+        ),
+        "schema": "With --stats, print a JSON Schema inferred from the statistics instead.",
+        "jobs": (
+            "Worker processes for --ndjson (also with --stats or --templates) and for several"
+            " files. 0 uses one per CPU."
+        ),
+        "stream": "Gron while reading the input, in document order, with memory bounded by depth.",
+        "format": (
+            'Output format. gron: path = value; lines. json: one [["a", 0], value] JSON array'
+            " per line, with the path keys after the root. --ungron reads both. csv/tsv: only"
+            " the arrays of objects sharing the same keys, each as a header row and one row per"
+            " element (strings as is, other values as in gron), separated by empty lines."
+            " compact: each line as the length shared with the previous line and the rest; read"
+            " by --ungron and --expand."
+        ),
+        "expand": "Expand --format=compact input back to gron lines.",
+        "sort": (
+            "Output order. canonical: sorted keys and numeric indices (document order with"
+            " --stream). lexical: sort whole lines in memory. external: sort whole lines using"
+            " temp files for inputs larger than memory."
+        ),
+        "sort_buffer_size": "Characters held in memory per run with --sort=external.",
+        "sort_run_lines": "Maximum lines per run with --sort=external.",
+        "max_depth": "Print containers this many levels down as {} or [], without their content.",
+        "max_items": "Only print the first this many elements of each array.",
+        "sample": (
+            "Only print a uniform random sample of this many elements of each array, keeping their"
+            " indices. Not available with the streaming parser."
+        ),
     }
-    file: str = "/dev/stdin"
+    file: list[str] = ["/dev/stdin"]  # noqa: RUF012
     ungron: bool = False
+    merge: bool = False
+    ndjson: bool = False
+    jobs: int = 0
+    path: str | None = None
+    query: str | None = None
+    index: str | None = None
+    lookup: str | None = None
+    values: bool = False
+    find: str | None = None
+    diff: list[str] | None = None
+    apply: list[str] | None = None
+    watch: str | None = None
+    watch_interval: float = DEFAULT_INTERVAL
+    stats: bool = False
+    templates: bool = False
+    schema: bool = False
+    stream: bool = False
+    backend: Literal["auto", "json", "orjson", "stream"] = "auto"
+    format: Literal["gron", "json", "csv", "tsv", "compact"] = "gron"
+    expand: bool = False
+    sort: Literal["canonical", "lexical", "external"] = "canonical"
+    sort_buffer_size: int = DEFAULT_BUFFER_SIZE
+    sort_run_lines: int = DEFAULT_RUN_LINES
+    max_depth: int | None = None
+    max_items: int | None = None
+    sample: int | None = None
 
     @classmethod
     def run(cls, argv: Sequence[str] | None = None) -> int:
         args = cls.parse_args(argv)
-        if args.ungron:
-            with open(args.file) as f:
-                print(
+        for pattern in (args.path, args.query):
+            if pattern:
+                try:
+                    PathFilter(pattern)
+                except ValueError as e:
+                    cls.parser().error(str(e))
+        if any(
+            limit is not None and limit < 0
+            for limit in (args.max_depth, args.max_items, args.sample)
+        ):
+            cls.parser().error("--max-depth, --max-items and --sample cannot be negative")
+        name = "stream" if args.stream else args.backend
+        columnar = args.format in ("csv", "tsv")
+        tree_only = args.diff or args.apply or args.watch or args.index or args.ndjson or columnar
+        # Streamed lines follow document order, so only stream canonical output when asked to.
+        streaming = not tree_only and (name == "stream" or args.sort != "canonical")
+        try:
+            backend = select_backend(name, size=_input_size(args.file[0]), streaming=streaming)
+        except ValueError as e:
+            cls.parser().error(str(e))
+        modes = (
+            (args.lookup or args.find, cls._run_lookup),
+            (args.diff, cls._run_diff),
+            (args.apply, cls._run_apply),
+            (args.watch, cls._run_watch),
+            (args.expand or args.ungron, cls._run_ungron),
+            (len(args.file) > 1 or os.path.isdir(args.file[0]), cls._run_files),
+            (args.index, cls._run_index),
+            (args.stats or args.templates, cls._run_stats),
+            (columnar, cls._run_columnar),
+        )
+        mode = next((mode for selected, mode in modes if selected), cls._run_gron)
+        try:
+            return mode(args, backend)
+        except MissingParentError as e:
+            print(f"gron: {e}, use --merge to create missing parents", file=sys.stderr)
+        except ValueError as e:
+            print(f"gron: {e}", file=sys.stderr)
+        return 2
+
+    @classmethod
+    def _run_lookup(cls, args: Gron, backend: str) -> int:  # noqa: ARG003
+        if not args.index:
+            cls.parser().error("--lookup and --find need --index")
+        with GronIndex(args.index) as index:
+            found = _write_lines(
+                index.subtree(args.lookup) if args.lookup else _find_lines(index, args.find or "")
+            )
+        return 0 if found else 1
+
+    @classmethod
+    def _run_diff(cls, args: Gron, backend: str) -> int:
+        if not args.diff or len(args.diff) != 2:  # noqa: PLR2004
+            cls.parser().error("--diff takes two files")
+        path_filter = _path_filter(args.path)
+        left, right = (_load_json(filename, backend) for filename in args.diff)
+        changed = _write_lines(
+            f"{sign}{line}"
+            for sign, line in diff_gron(
+                iter_gron(left, path_filter),
+                iter_gron(right, path_filter),
+            )
+        )
+        return 1 if changed else 0
+
+    @classmethod
+    def _run_apply(cls, args: Gron, backend: str) -> int:
+        if not args.apply or len(args.apply) != 2:  # noqa: PLR2004
+            cls.parser().error("--apply takes a patch file and a JSON file")
+        patch, target = args.apply
+        patched = apply_patch(_load_json(target, backend), _read_lines([patch]))
+        _write_lines([json.dumps(patched, indent=2, ensure_ascii=False)])
+        return 0
+
+    @classmethod
+    def _run_watch(cls, args: Gron, backend: str) -> int:
+        if not args.watch:
+            cls.parser().error("--watch takes a file")
+        changes = watch_gron(
+            args.watch,
+            lambda filename: _load_json(filename, backend),
+            interval=args.watch_interval,
+            path_filter=_path_filter(args.path),
+        )
+        with suppress(KeyboardInterrupt):
+            for batch in changes:
+                _write_lines(f"{sign}{line}" for sign, line in batch)
+        return 0
+
+    @classmethod
+    def _run_ungron(cls, args: Gron, backend: str) -> int:  # noqa: ARG003
+        if args.expand:
+            _write_lines(line.rstrip("\n") for line in expand_front_coded(_read_lines(args.file)))
+        elif args.ndjson:
+            _write_lines(
+                (
+                    json.dumps(element, separators=(",", ":"), sort_keys=True)
+                    for element in ungron_elements(_read_lines(args.file), merge=args.merge)
+                ),
+                flush_each=any(map(_is_pipe, args.file)),
+            )
+        else:
+            _write_lines(
+                [
                     json.dumps(
-                        ungron(f),
+                        ungron(_read_lines(args.file), merge=args.merge),
                         indent=2,
                         sort_keys=True,
                     ),
-                )
-            return 0
-        with open(args.file) as f:
-            for line in gron(json.load(f)):
-                print(line)
+                ],
+            )
         return 0
 
+    @classmethod
+    def _run_files(cls, args: Gron, backend: str) -> int:
+        limits = (args.max_depth, args.max_items, args.sample)
+        if (
+            args.format != "gron"
+            or any((args.query, args.ndjson, args.stream, args.index, args.stats, args.templates))
+            or any(limit is not None for limit in limits)
+        ):
+            cls.parser().error(
+                "Several files or a directory are only supported in the default gron format,"
+                " optionally with --path and --sort, not with --max-depth, --max-items or --sample"
+            )
+        errors: list[str] = []
+
+        def report(error: str) -> None:
+            errors.append(error)
+            print(error, file=sys.stderr)
+
+        files = gron_files(
+            _json_files(args.file),
+            jobs=args.jobs,
+            path_filter=_path_filter(args.path),
+            loads=loads_function(backend),
+            on_error=report,
+        )
+        _write_lines(_sort_lines(files, args))
+        # Like grep, files that could not be read give exit status 2.
+        return 2 if errors else 0
+
+    @classmethod
+    def _run_index(cls, args: Gron, backend: str) -> int:
+        if not args.index:
+            cls.parser().error("--index takes a file")
+        if args.path or any(
+            limit is not None for limit in (args.max_depth, args.max_items, args.sample)
+        ):
+            cls.parser().error(
+                "--index covers the whole document, not --path, --max-depth, --max-items or"
+                " --sample"
+            )
+        index_json(args.index, _load_json(args.file[0], backend), values=args.values)
+        return 0
+
+    @classmethod
+    def _run_stats(cls, args: Gron, backend: str) -> int:
+        limits = (args.max_depth, args.max_items, args.sample)
+        if (
+            args.path
+            or args.query
+            or args.format != "gron"
+            or any(limit is not None for limit in limits)
+        ):
+            cls.parser().error(
+                "--stats and --templates cover the whole document, not --path, --query, --format,"
+                " --max-depth, --max-items or --sample"
+            )
+        with open_input(args.file[0]) as f:
+            if args.ndjson:
+                stats = ndjson_stats(f, jobs=args.jobs, loads=loads_function(backend))
+            else:
+                stats = SchemaStats()
+                stats.add_events(JSONEventReader(f))
+        if args.templates:
+            _write_lines(stats.frequency_lines())
+        elif args.schema:
+            _write_lines([json.dumps(stats.json_schema(), indent=2)])
+        else:
+            _write_lines(stats.lines())
+        return 0
+
+    @classmethod
+    def _run_columnar(cls, args: Gron, backend: str) -> int:
+        if args.query or args.ndjson or args.path or args.sort != "canonical":
+            cls.parser().error(
+                "--format csv/tsv needs the whole document in canonical order, not --query,"
+                " --ndjson, --path or --sort"
+            )
+        _write_lines(
+            iter_columnar(
+                _load_json(args.file[0], backend),
+                delimiter="," if args.format == "csv" else "\t",
+            ),
+        )
+        return 0
+
+    @classmethod
+    def _run_gron(cls, args: Gron, backend: str) -> int:
+        with open_input(args.file[0]) as f:
+            lines, rendered = cls._gron_lines(f, args, backend)
+            lines = _sort_lines(lines, args)
+            # Lines are rendered as gron text and converted after sorting, unless rendered directly.
+            if args.format == "json" and not rendered:
+                lines = map(gron_to_json, lines)
+            elif args.format == "compact":
+                lines = front_code(lines)
+            # Streamed canonical output follows the input, so it is not held back by blocks.
+            streamed = args.stream and args.sort == "canonical"
+            found = _write_lines(lines, flush_each=streamed and _is_pipe(args.file[0]))
+        # Like --lookup, a --query path that is not in the document is a failure.
+        return 1 if args.query and not found else 0
+
+    @classmethod
+    def _gron_lines(cls, f: IO[str], args: Gron, backend: str) -> tuple[Iterable[str], bool]:
+        path_filter = _path_filter(args.path)
+        limited = any(limit is not None for limit in (args.max_depth, args.max_items, args.sample))
+        if limited and (args.query or args.ndjson):
+            cls.parser().error("--query and --ndjson print every item at any depth")
+        if args.query:
+            path_filter = PathFilter(args.query)
+            if not path_filter.exact:
+                cls.parser().error("--query takes an exact path, use --path for patterns")
+            return stream_gron(f, path_filter=path_filter, stop_early=True), False
+        if args.ndjson:
+            lines = gron_ndjson(
+                f, jobs=args.jobs, path_filter=path_filter, loads=loads_function(backend)
+            )
+            return lines, False
+        if backend == "stream":
+            if args.sample is not None:
+                cls.parser().error("--sample needs the whole document, use --max-items")
+            lines = stream_gron(
+                f,
+                path_filter=path_filter,
+                max_depth=args.max_depth,
+                max_items=args.max_items,
+            )
+            return lines, False
+        if limited:
+            if path_filter is not None:
+                cls.parser().error(
+                    "--path with --max-depth, --max-items or --sample needs --stream"
+                )
+            lines = iter_gron_limited(
+                load(f, backend),
+                max_depth=args.max_depth,
+                max_items=args.max_items,
+                sample=args.sample,
+            )
+            return lines, False
+        if args.format == "json" and args.sort == "canonical":
+            return iter_gron_json(load(f, backend), path_filter), True
+        return iter_gron(load(f, backend), path_filter), False
+
 
 if __name__ == "__main__":
     # prog = f'python3 -m {__package__}' if __package__ and not sys.argv[0].endswith('__main_.py') else None  # noqa: E501
     # CLIApp.main(prog=prog)
-    Gron.run()
+    raise SystemExit(Gron.run())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Callable
+from typing import TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from typing import IO
+    from gron import JSON_TYPE
+
+
+BACKEND_ENV = "GRON_BACKEND"
+BACKENDS = ("json", "orjson", "stream")
+# Inputs at least this large are streamed when the caller does not need the parsed tree.
+STREAM_THRESHOLD = 1 << 30
+# orjson reads integers outside the int64 and uint64 ranges as floats. Such number tokens have at
+# least 19 digits; digits inside strings or fractions are not number tokens of their own.
+_LONG_INT = re.compile(r'(?<![\w".+-])-?[0-9]{19,}(?![\w".])')
+_ORJSON_INTS = range(-(1 << 63), 1 << 64)
+
+
+def _has_wide_int(text: str) -> bool:
+    return any(int(match.group()) not in _ORJSON_INTS for match in _LONG_INT.finditer(text))
+
+
+def available_backends() -> list[str]:
+    return [name for name in BACKENDS if name != "orjson" or orjson is not None]
+
+
+def select_backend(name: str = "auto", *, size: int = 0, streaming: bool = False) -> str:
+    """
+    Resolve ``name`` (a backend or ``auto``) to an installed parser backend.
+
+    ``streaming`` tells whether the caller accepts lines in document order instead of a tree.
+    ``auto`` prefers the backend in the ``GRON_BACKEND`` environment variable when it is usable,
+    then the streaming parser for inputs of ``STREAM_THRESHOLD`` bytes or more, then orjson if it
+    is installed, then the standard library.
+    """
+    if name == "auto":
+        preferred = os.environ.get(BACKEND_ENV, "")
+        if preferred in available_backends() and (streaming or preferred != "stream"):
+            return preferred
+        if streaming and size >= STREAM_THRESHOLD:
+            return "stream"
+        return "orjson" if orjson is not None else "json"
+    if name not in available_backends():
+        msg = f"Unknown or unavailable JSON backend {name!r}, choose from {available_backends()}"
+        raise ValueError(msg)
+    if name == "stream" and not streaming:
+        msg = "The stream backend does not build a tree and cannot be used here"
+        raise ValueError(msg)
+    return name
+
+
+def _orjson_loads(text: str) -> JSON_TYPE:
+    if _has_wide_int(text):
+        return json.loads(text)
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # NaN and Infinity are only accepted by the standard library; it also reports real errors.
+        return json.loads(text)
+
+
+def loads_function(backend: str) -> Callable[[str], JSON_TYPE]:
+    """``loads`` of a tree backend; every backend returns the same values as ``json.loads``."""
+    return _orjson_loads if backend == "orjson" else json.loads
+
+
+def load(fp: IO[str], backend: str) -> JSON_TYPE:
+    return loads_function(backend)(fp.read())
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import csv
+import json
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gron import _scalar_value
+from gron import _walk
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from gron import JSON_TYPE
+
+
+class _Echo:
+    """File-like object whose write returns the text, so a csv writer formats a single row."""
+
+    def write(self, text: str) -> str:
+        return text
+
+
+def _table_keys(value: list[Any]) -> list[str] | None:
+    """Sorted keys shared by every element of ``value`` if it is a list of such objects."""
+    if not value or not isinstance(value[0], dict) or not value[0]:
+        return None
+    keys = value[0].keys()
+    if all(isinstance(row, dict) and row.keys() == keys for row in value):
+        return sorted(keys)
+    return None
+
+
+def _cell(value: JSON_TYPE) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), sort_keys=True)
+    return _scalar_value(value)
+
+
+def iter_columnar(
+    obj: JSON_TYPE,
+    path: str = "json",
+    delimiter: str = ",",
+) -> Generator[str, None, None]:
+    """
+    Write every array of objects sharing the same keys in ``obj`` as a table, in canonical order.
+
+    A table is a header row (the array path, then the sorted keys) followed by one row per element
+    (its index, then its values), with the given CSV ``delimiter``. Strings are written as is and
+    quoted by the CSV writer where needed, other scalars as in gron and nested containers as
+    compact JSON. Tables are separated by an empty line and nothing else of ``obj`` is written.
+    """
+    row = csv.writer(_Echo(), delimiter=delimiter, lineterminator="").writerow
+    # Tables are written whole, so the walk does not enter them.
+    walk = _walk(
+        obj,
+        path,
+        enter=lambda value, _: not isinstance(value, list) or _table_keys(value) is None,
+    )
+    tables = 0
+    for table_path, value in walk:
+        if isinstance(value, list) and (keys := _table_keys(value)) is not None:
+            if tables:
+                yield ""
+            tables += 1
+            yield row([table_path, *keys])
+            for i, element in enumerate(value):
+                yield row([i, *(_cell(element[key]) for key in keys)])
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Generator
+    from typing import IO
+    from _typeshed import WriteableBuffer
+
+
+_DECOMPRESSORS: tuple[tuple[bytes, Callable[..., IO[str]]], ...] = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+_MAGIC_SIZE = max(len(prefix) for prefix, _ in _DECOMPRESSORS)
+
+
+class _Prefixed(io.RawIOBase):
+    """Raw stream returning ``prefix``, already read from ``raw``, before the rest of ``raw``."""
+
+    def __init__(self, prefix: bytes, raw: io.RawIOBase) -> None:
+        self._prefix = prefix
+        self._raw = raw
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: WriteableBuffer) -> int | None:
+        view = memoryview(buffer).cast("B")
+        if not self._prefix:
+            return self._raw.readinto(view)
+        n = min(len(view), len(self._prefix))
+        view[:n] = self._prefix[:n]
+        self._prefix = self._prefix[n:]
+        return n
+
+
+@contextmanager
+def open_input(filename: str) -> Generator[IO[str], None, None]:
+    """
+    Open ``filename`` for reading as text, decompressing gzip, bzip2 and xz on the fly.
+
+    The format is detected from the magic bytes, so it also works for pipes such as /dev/stdin.
+    """
+    with open(filename, "rb", buffering=0) as file:
+        # A pipe may deliver the magic bytes over several reads.
+        magic = b""
+        while len(magic) < _MAGIC_SIZE:
+            chunk = file.read(_MAGIC_SIZE - len(magic))
+            if not chunk:
+                break
+            magic += chunk
+        raw = io.BufferedReader(_Prefixed(magic, file))
+        for prefix, decompress in _DECOMPRESSORS:
+            if magic.startswith(prefix):
+                with decompress(raw, "rt") as f:
+                    yield f
+                return
+        with io.TextIOWrapper(raw) as f:
+            yield f
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from gron import _LINE
+from gron import _path_keys
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
+
+
+REMOVED = "-"
+ADDED = "+"
+
+
+def _canonical_key(path: str) -> tuple[tuple[int, int | str], ...]:
+    # Canonical gron order is a pre-order walk with sorted keys and numeric indices, which is the
+    # lexicographic order of the key tuples (indices and keys never share a container).
+    keys: list[tuple[int, int | str]] = [
+        (0, key) if isinstance(key, int) else (1, key) for key in _path_keys(path)
+    ]
+    return tuple(keys)
+
+
+def _keyed(
+    lines: Iterable[str],
+) -> Generator[tuple[tuple[tuple[int, int | str], ...], str, str], None, None]:
+    for line in lines:
+        match = _LINE.fullmatch(line)
+        if match is None:
+            if line.isspace() or not line:
+                continue
+            msg = f"Invalid gron line: {line.strip()!r}"
+            raise ValueError(msg)
+        yield _canonical_key(match["path"]), match["value"], line.strip()
+
+
+def diff_gron(left: Iterable[str], right: Iterable[str]) -> Generator[tuple[str, str], None, None]:
+    """
+    Merge two gron streams in canonical order and yield ``(REMOVED | ADDED, line)`` differences.
+
+    A changed value is a removal of the old line directly followed by an addition of the new one.
+    Only the current line of each side is held, so memory stays bounded when both inputs are
+    produced lazily in canonical order (``iter_gron``).
+    """
+    left_lines = _keyed(left)
+    right_lines = _keyed(right)
+    a = next(left_lines, None)
+    b = next(right_lines, None)
+    while a is not None and b is not None:
+        if a[0] < b[0]:
+            yield REMOVED, a[2]
+            a = next(left_lines, None)
+        elif b[0] < a[0]:
+            yield ADDED, b[2]
+            b = next(right_lines, None)
+        else:
+            if a[1] != b[1]:
+                yield REMOVED, a[2]
+                yield ADDED, b[2]
+            a = next(left_lines, None)
+            b = next(right_lines, None)
+    if a is not None:
+        yield REMOVED, a[2]
+        yield from ((REMOVED, line) for _, _, line in left_lines)
+    if b is not None:
+        yield ADDED, b[2]
+        yield from ((ADDED, line) for _, _, line in right_lines)
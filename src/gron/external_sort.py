@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import heapq
+import os
+from contextlib import ExitStack
+from itertools import chain
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+
+from comma.config import temp_dir_context
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+
+DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+DEFAULT_RUN_LINES = 1_000_000
+MERGE_FAN_IN = 64
+
+
+def _write_run(lines: Iterable[str], filename: str) -> str:
+    with open(filename, "w", encoding="utf-8") as f:
+        f.writelines(f"{line}\n" for line in lines)
+    return filename
+
+
+def _read_run(filename: str, stack: ExitStack) -> Iterator[str]:
+    f = stack.enter_context(open(filename, encoding="utf-8"))  # noqa: SIM115
+    return (line[:-1] for line in f)
+
+
+def _spill(lines: Iterable[str], temp_dir: str, buffer_size: int, run_lines: int) -> list[str]:
+    runs: list[str] = []
+    run: list[str] = []
+    size = 0
+    for line in lines:
+        run.append(line)
+        size += len(line)
+        if size >= buffer_size or len(run) >= run_lines:
+            run.sort()
+            runs.append(_write_run(run, os.path.join(temp_dir, f"run-{len(runs)}")))
+            run = []
+            size = 0
+    if run:
+        run.sort()
+        runs.append(_write_run(run, os.path.join(temp_dir, f"run-{len(runs)}")))
+    return runs
+
+
+def _external_sort(
+    lines: Iterable[str],
+    temp_dir: str,
+    buffer_size: int,
+    run_lines: int,
+) -> Generator[str, None, None]:
+    runs = _spill(lines, temp_dir, buffer_size, run_lines)
+    # Merge in passes so no more than MERGE_FAN_IN runs are open at once.
+    while len(runs) > MERGE_FAN_IN:
+        merged: list[str] = []
+        for i in range(0, len(runs), MERGE_FAN_IN):
+            group = runs[i : i + MERGE_FAN_IN]
+            filename = os.path.join(temp_dir, f"merge-{len(runs)}-{i}")
+            with ExitStack() as stack:
+                _write_run(heapq.merge(*(_read_run(run, stack) for run in group)), filename)
+            for run in group:
+                os.remove(run)
+            merged.append(filename)
+        runs = merged
+    with ExitStack() as stack:
+        yield from heapq.merge(*(_read_run(run, stack) for run in runs))
+
+
+def external_sort(
+    lines: Iterable[str],
+    *,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    run_lines: int = DEFAULT_RUN_LINES,
+    temp_dir: str | None = None,
+) -> Generator[str, None, None]:
+    """
+    Sort ``lines`` lexically without holding them all in memory.
+
+    Lines are buffered until ``buffer_size`` characters or ``run_lines`` lines, sorted, and
+    spilled as a run under ``temp_dir`` (defaults to ``comma_utils.temp_dir``). The runs are then
+    k-way merged. Input that fits in a single run never touches the disk.
+    """
+    iterator = iter(lines)
+    head: list[str] = []
+    size = 0
+    for line in iterator:
+        head.append(line)
+        size += len(line)
+        if size >= buffer_size or len(head) >= run_lines:
+            break
+    else:
+        yield from sorted(head)
+        return
+
+    rest = chain(head, iterator)
+    if temp_dir is not None:
+        with TemporaryDirectory(dir=temp_dir) as work_dir:
+            yield from _external_sort(rest, work_dir, buffer_size, run_lines)
+        return
+
+    with temp_dir_context() as work_dir:
+        yield from _external_sort(rest, work_dir, buffer_size, run_lines)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from gron import _gron_helper
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
+    from types import TracebackType
+    from typing_extensions import Self
+    from gron import JSON_TYPE
+
+
+# File layout (little endian):
+#   header:  magic, version, entry count, digest of the entries and data
+#   entries: (offset, path length, value length) per path, sorted by the UTF-8 path bytes
+#   data:    path bytes immediately followed by the rendered gron value bytes, per entry
+MAGIC = b"GIDX"
+VERSION = 2
+_HEADER = struct.Struct("<4sIQQ")
+_ENTRY = struct.Struct("<QII")
+
+# Inverted value index, stored next to the path index (see value_index_filename):
+#   header:   magic, version, bucket count (a power of two), digest of its path index
+#   buckets:  open-addressing hash table of (value hash, postings offset, postings count)
+#   postings: entry numbers in the path index whose value has that hash
+VALUES_MAGIC = b"GVIX"
+_BUCKET = struct.Struct("<QQQ")
+_POSTING = struct.Struct("<Q")
+
+
+def value_index_filename(filename: str) -> str:
+    return f"{filename}.values"
+
+
+def _value_hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def _write_value_index(filename: str, encoded: list[tuple[bytes, bytes]], digest: int) -> None:
+    postings: dict[bytes, list[int]] = {}
+    for i, (_, value) in enumerate(encoded):
+        if value not in (b"{}", b"[]"):
+            postings.setdefault(value, []).append(i)
+    bucket_count = 1
+    while bucket_count < 2 * len(postings):
+        bucket_count *= 2
+    buckets = [(0, 0, 0)] * bucket_count
+    offset = _HEADER.size + _BUCKET.size * bucket_count
+    for value, entries in postings.items():
+        value_hash = _value_hash(value)
+        slot = value_hash & (bucket_count - 1)
+        while buckets[slot][2]:
+            slot = (slot + 1) & (bucket_count - 1)
+        buckets[slot] = (value_hash, offset, len(entries))
+        offset += _POSTING.size * len(entries)
+    with open(filename, "wb") as f:
+        f.write(_HEADER.pack(VALUES_MAGIC, VERSION, bucket_count, digest))
+        f.writelines(_BUCKET.pack(*bucket) for bucket in buckets)
+        for entries in postings.values():
+            f.writelines(_POSTING.pack(i) for i in entries)
+
+
+def write_index(filename: str, pairs: Iterable[tuple[str, str]], *, values: bool = False) -> int:
+    """
+    Write ``(path, value)`` pairs, as produced by ``_gron_helper``, to ``filename``.
+
+    With ``values`` an inverted index from scalar values to their paths is written next to it,
+    otherwise an inverted index left there by an earlier write is removed.
+    """
+    encoded = sorted((path.encode(), value.encode()) for path, value in pairs)
+    offset = _HEADER.size + _ENTRY.size * len(encoded)
+    entries = []
+    for path, value in encoded:
+        entries.append(_ENTRY.pack(offset, len(path), len(value)))
+        offset += len(path) + len(value)
+    # The value index records this digest, so one written for other content is never used.
+    hasher = hashlib.blake2b(digest_size=8)
+    for chunk in entries:
+        hasher.update(chunk)
+    for path, value in encoded:
+        hasher.update(path)
+        hasher.update(value)
+    digest = int.from_bytes(hasher.digest(), "little")
+    with open(filename, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(encoded), digest))
+        f.writelines(entries)
+        for path, value in encoded:
+            f.write(path)
+            f.write(value)
+    if values:
+        _write_value_index(value_index_filename(filename), encoded, digest)
+    else:
+        with suppress(FileNotFoundError):
+            os.remove(value_index_filename(filename))
+    return len(encoded)
+
+
+def index_json(filename: str, obj: JSON_TYPE, *, values: bool = False) -> int:
+    """Index every gron line of ``obj``; keys are exactly the paths ``gron`` prints."""
+    return write_index(filename, _gron_helper(obj), values=values)
+
+
+class GronIndex:
+    """
+    Read-only view of a path index written by ``write_index``.
+
+    The file is memory mapped and looked up by binary search over the sorted entries, so a query
+    costs O(log n) page reads and never parses the original JSON.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self._mm = self._map(filename, MAGIC)
+        _, _, self._count, digest = _HEADER.unpack_from(self._mm)
+        self._values: mmap.mmap | None = None
+        self._values_error = "The index was written without the inverted value index"
+        values_filename = value_index_filename(filename)
+        if os.path.exists(values_filename):
+            values = self._map(values_filename, VALUES_MAGIC)
+            if _HEADER.unpack_from(values)[3] == digest:
+                self._values = values
+            else:
+                values.close()
+                self._values_error = f"{values_filename} was written for another {filename}"
+
+    @staticmethod
+    def _map(filename: str, expected: bytes) -> mmap.mmap:
+        with open(filename, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _ = _HEADER.unpack_from(mm)
+        if magic != expected or version != VERSION:
+            mm.close()
+            msg = f"{filename} is not a gron index"
+            raise ValueError(msg)
+        return mm
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mm.close()
+        if self._values is not None:
+            self._values.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> tuple[bytes, bytes]:
+        offset, path_len, value_len = _ENTRY.unpack_from(self._mm, _HEADER.size + _ENTRY.size * i)
+        end = offset + path_len
+        return self._mm[offset:end], self._mm[end : end + value_len]
+
+    def _bisect(self, path: bytes) -> int:
+        """Index of the first entry whose path is >= ``path``."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < path:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, path: str) -> str | None:
+        """Rendered gron value at ``path`` (``{}``/``[]`` for containers), or None."""
+        encoded = path.encode()
+        i = self._bisect(encoded)
+        if i < self._count:
+            found, value = self._entry(i)
+            if found == encoded:
+                return value.decode()
+        return None
+
+    def _prefixed(self, prefix: bytes) -> Generator[tuple[bytes, bytes], None, None]:
+        i = self._bisect(prefix)
+        while i < self._count:
+            path, value = self._entry(i)
+            if not path.startswith(prefix):
+                return
+            yield path, value
+            i += 1
+
+    def subtree(self, path: str) -> Generator[str, None, None]:
+        """Gron lines of ``path`` and everything below it, in byte order of the paths."""
+        value = self.get(path)
+        if value is None:
+            return
+        yield f"{path} = {value};"
+        # Children of objects render as .key or ["key"], children of arrays as [i].
+        separators = {"{}": (b".", b"["), "[]": (b"[",)}.get(value, ())
+        for separator in separators:
+            for child, child_value in self._prefixed(path.encode() + separator):
+                yield f"{child.decode()} = {child_value.decode()};"
+
+    def find(self, value: str) -> Generator[str, None, None]:
+        """
+        Paths whose rendered gron value is ``value`` (``"abc123"``, ``42``, ``true``).
+
+        Needs the inverted index written with ``values=True``; one hash probe per lookup.
+        """
+        if self._values is None:
+            raise ValueError(self._values_error)
+        encoded = value.encode()
+        value_hash = _value_hash(encoded)
+        bucket_count = _HEADER.unpack_from(self._values)[2]
+        slot = value_hash & (bucket_count - 1)
+        while True:
+            found_hash, offset, count = _BUCKET.unpack_from(
+                self._values, _HEADER.size + _BUCKET.size * slot
+            )
+            if not count:
+                return
+            if found_hash == value_hash:
+                postings = self._values[offset : offset + _POSTING.size * count]
+                for (i,) in _POSTING.iter_unpack(postings):
+                    path, found = self._entry(i)
+                    # Values are compared too, in case two of them share a hash.
+                    if found == encoded:
+                        yield path.decode()
+            slot = (slot + 1) & (bucket_count - 1)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from typing_extensions import TypeAlias
+
+from gron import _gron_helper
+from gron.compression import open_input
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
+    from concurrent.futures import Future
+    from gron.path_filter import PathFilter
+
+
+DEFAULT_CHUNK_LINES = 1000
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def ordered_map(
+    func: Callable[[_T], _R],
+    items: Iterable[_T],
+    jobs: int = 0,
+) -> Generator[_R, None, None]:
+    """
+    Like ``map`` but on a process pool of ``jobs`` workers (0: one per CPU).
+
+    Results come back in input order, and at most ``2 * jobs`` items are in flight, so memory stays
+    bounded however long ``items`` is.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        yield from map(func, items)
+        return
+    with ProcessPoolExecutor(jobs) as executor:
+        pending: deque[Future[_R]] = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= 2 * jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+_Chunk: TypeAlias = tuple[int, list[str], Optional["PathFilter"], Callable[[str], Any]]
+
+
+def _gron_records(chunk: _Chunk) -> list[str]:
+    start, records, path_filter, loads = chunk
+    return [
+        f"{path} = {value};"
+        for i, record in enumerate(records, start)
+        for path, value in _gron_helper(loads(record), f"json[{i}]", path_filter)
+    ]
+
+
+def _chunk_records(
+    lines: Iterable[str],
+    chunk_lines: int,
+    path_filter: PathFilter | None,
+    loads: Callable[[str], Any],
+) -> Generator[_Chunk, None, None]:
+    start = 0
+    chunk: list[str] = []
+    for line in lines:
+        if line.isspace() or not line:
+            continue
+        chunk.append(line)
+        if len(chunk) >= chunk_lines:
+            yield start, chunk, path_filter, loads
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk, path_filter, loads
+
+
+def gron_ndjson(
+    lines: Iterable[str],
+    *,
+    jobs: int = 0,
+    chunk_lines: int = DEFAULT_CHUNK_LINES,
+    path_filter: PathFilter | None = None,
+    loads: Callable[[str], Any] = json.loads,
+) -> Generator[str, None, None]:
+    """
+    Gron JSON Lines input as a top-level array: record ``n`` is rendered under ``json[n]``.
+
+    Records are parsed with ``loads`` by ``jobs`` worker processes in chunks of ``chunk_lines``
+    and the output is written in input order. ``gron --ungron --ndjson`` turns it back into JSON
+    Lines.
+    """
+    if path_filter is None or path_filter.matches(path_filter.start("json"), "json"):
+        yield "json = [];"
+    chunks = _chunk_records(lines, chunk_lines, path_filter, loads)
+    for block in ordered_map(_gron_records, chunks, jobs):
+        yield from block
+
+
+def _gron_file(item: tuple[str, PathFilter | None, Callable[[str], Any]]) -> tuple[list[str], str]:
+    filename, path_filter, loads = item
+    try:
+        with open_input(filename) as f:
+            obj = loads(f.read())
+    except Exception as e:  # noqa: BLE001
+        # Like grep, a file that cannot be read or parsed is reported without stopping the others.
+        return [], f"{filename}: {e}"
+    lines = [
+        f"{filename}:{path} = {value};" for path, value in _gron_helper(obj, "json", path_filter)
+    ]
+    return lines, ""
+
+
+def gron_files(
+    filenames: Iterable[str],
+    *,
+    jobs: int = 0,
+    path_filter: PathFilter | None = None,
+    loads: Callable[[str], Any] = json.loads,
+    on_error: Callable[[str], None] | None = None,
+) -> Generator[str, None, None]:
+    """
+    Gron many files on ``jobs`` worker processes, prefixing each line with ``filename:``.
+
+    The lines of a file stay together and files are written in the order given. A file that fails
+    is passed to ``on_error`` as ``filename: error`` and skipped, or raises ValueError without it.
+    """
+    items = ((filename, path_filter, loads) for filename in filenames)
+    for block, error in ordered_map(_gron_file, items, jobs):
+        if error:
+            if on_error is None:
+                raise ValueError(error)
+            on_error(error)
+        yield from block
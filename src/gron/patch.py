@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gron import _LINE
+from gron import _path_keys
+from gron import _SEGMENT_PATTERN
+from gron import _UngronTree
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from gron import JSON_TYPE
+
+
+# Marks deleted array elements until the end of the patch, so every index in the patch refers to
+# the same positions (as in gron --diff output) instead of shifting after each deletion.
+_DELETED = object()
+# Deletions name a node of the patched document, so their path starts at its root.
+_DELETED_PATH = re.compile(rf"json(?:{_SEGMENT_PATTERN})*")
+
+
+def _deleted_path(line: str) -> str:
+    match = _LINE.fullmatch(line)
+    path = match["path"] if match else line.strip().rstrip(";")
+    if not _DELETED_PATH.fullmatch(path):
+        msg = f"Invalid gron path in delete line: {line.strip()!r}"
+        raise ValueError(msg)
+    return path
+
+
+def _compact(node: Any) -> Any:  # noqa: ANN401
+    stack = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            value[:] = [v for v in value if v is not _DELETED]
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+    return node
+
+
+def apply_patch(obj: JSON_TYPE, lines: Iterable[str]) -> JSON_TYPE:
+    """
+    Apply gron lines to ``obj`` in place and return the patched value.
+
+    ``path = value;`` (or ``+path = value;``) assigns, creating missing parents. ``-path`` or
+    ``-path = value;`` deletes the node if it exists, so ``gron --diff a b`` output turns ``a``
+    into ``b``. Deleted array elements are removed once all lines are applied, so every index in
+    the patch refers to the positions before the patch. A delete line without a valid gron path
+    from the ``json`` root raises ValueError.
+    """
+    tree = _UngronTree(merge=True)
+    tree.holder[0] = obj
+    tree.empty = False
+    deletions = False
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith("+"):
+            tree.add(stripped[1:])
+            continue
+        if not stripped.startswith("-"):
+            tree.add(line)
+            continue
+        container: Any = tree.holder
+        key: str | int = 0
+        for next_key in _path_keys(_deleted_path(stripped[1:])):
+            node = container[key]
+            if not isinstance(node, list if isinstance(next_key, int) else dict):
+                break
+            if isinstance(next_key, int) and next_key >= len(node):
+                break
+            if isinstance(next_key, str) and next_key not in node:
+                break
+            container, key = node, next_key
+        else:
+            # Indexed containers below the deleted node would keep receiving assignments.
+            tree.containers.clear()
+            if isinstance(container, dict):
+                del container[key]
+            else:
+                container[key] = None if container is tree.holder else _DELETED
+                deletions = True
+    return _compact(tree.holder[0]) if deletions else tree.holder[0]
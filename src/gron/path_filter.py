@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from typing_extensions import TypeAlias
+
+from gron import _path_keys
+from gron import _ROOT
+
+if TYPE_CHECKING:
+    from re import Pattern
+
+
+# A state is the set of glob positions reachable after the keys seen so far; None prunes.
+State: TypeAlias = Optional[frozenset[int]]
+
+_ANY_DEPTH = None
+_GLOB_SEGMENT = re.compile(
+    r'(?P<any>\.\*\*)|\.(?P<name>[^.\[\s]+)|\[(?P<index>[\d*?]+)\]|\[(?P<quoted>"(?:[^"\\]|\\.)*")\]'
+)
+
+
+def _glob_regex(glob: str) -> Pattern[str]:
+    return re.compile(
+        ".*".join(".".join(map(re.escape, part.split("?"))) for part in glob.split("*"))
+    )
+
+
+class PathFilter:
+    """
+    Path pattern checked while gron walks the document.
+
+    ``pattern`` is either a glob over gron paths such as ``json.items[*].id``, where ``*`` matches
+    within one key or index and ``.**`` matches any number of levels, or, when it is not a valid
+    glob starting at the document ``root``, a regular expression searched in every path (so
+    ``id`` greps for paths containing ``id``). A glob matches a node and its whole
+    subtree, and subtrees that cannot match are skipped without being formatted. Regular
+    expressions cannot prune, they only avoid formatting values of paths that do not match.
+    """
+
+    def __init__(self, pattern: str, root: str = "json") -> None:
+        self.pattern = pattern
+        self._root: Pattern[str] | None = None
+        self._segments: list[tuple[bool, Pattern[str]] | None] = []
+        self._regex: Pattern[str] | None = None
+        root_match = re.match(r"[\w$*?]+", pattern)
+        end = root_match.end() if root_match else 0
+        for match in _GLOB_SEGMENT.finditer(pattern, end):
+            if match.start() != end:
+                break
+            end = match.end()
+            if match["any"]:
+                self._segments.append(_ANY_DEPTH)
+            elif match["index"]:
+                self._segments.append((True, _glob_regex(match["index"])))
+            else:
+                name = match["name"] or json.loads(match["quoted"])
+                self._segments.append((False, _glob_regex(name)))
+        if root_match and end == len(pattern) and _glob_regex(root_match.group()).fullmatch(root):
+            self._root = _glob_regex(root_match.group())
+        else:
+            self._segments = []
+            try:
+                self._regex = re.compile(pattern)
+            except re.error as e:
+                msg = f"Invalid path pattern {pattern!r}: {e}"
+                raise ValueError(msg) from None
+        self._accept = len(self._segments)
+        # An exact path (no wildcards) matches at most one node.
+        self.exact = self._regex is None and not any(c in pattern for c in "*?")
+
+    def _closure(self, positions: set[int]) -> State:
+        for start in sorted(positions):
+            i = start
+            while i < self._accept and self._segments[i] is _ANY_DEPTH:
+                i += 1
+                positions.add(i)
+        return frozenset(positions) if positions else None
+
+    def start(self, path: str) -> State:
+        """State for the node at ``path`` (a root name, optionally followed by gron segments)."""
+        match = _ROOT.match(path)
+        if match is None:
+            return None
+        if self._regex is not None:
+            return frozenset()
+        if self._root is None or not self._root.fullmatch(match.group()):
+            return None
+        state = self._closure({0})
+        for key in _path_keys(path[match.end() :]):
+            state = self.step(state, key)
+        return state
+
+    def step(self, state: State, key: str | int) -> State:
+        """State of the child ``key`` of a node in ``state``; None if nothing below can match."""
+        if state is None or self._regex is not None or self._accept in state:
+            return state
+        positions: set[int] = set()
+        text = str(key)
+        for i in state:
+            segment = self._segments[i]
+            if segment is _ANY_DEPTH:
+                positions.add(i)
+            elif segment[0] == isinstance(key, int) and segment[1].fullmatch(text):
+                positions.add(i + 1)
+        return self._closure(positions)
+
+    def matches(self, state: State, path: str) -> bool:
+        if state is None:
+            return False
+        if self._regex is not None:
+            return self._regex.search(path) is not None
+        return self._accept in state
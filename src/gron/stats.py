@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from typing_extensions import TypeAlias
+
+from gron import _key_segment
+from gron.parallel import _chunk_records
+from gron.parallel import DEFAULT_CHUNK_LINES
+from gron.parallel import ordered_map
+from gron.stream import END_ARRAY
+from gron.stream import END_MAP
+from gron.stream import MAP_KEY
+from gron.stream import SCALAR
+from gron.stream import START_ARRAY
+from gron.stream import START_MAP
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from gron import JSON_TYPE
+    from gron.parallel import _Chunk
+    from gron.stream import Event
+
+
+# Path keys with every array index replaced by None, rendered as [*].
+Template: TypeAlias = tuple[Optional[str], ...]
+
+JSON_SCHEMA = "https://json-schema.org/draft/2020-12/schema"
+
+
+def _type_name(value: JSON_TYPE) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    return "string"
+
+
+def render_template(template: Template, root: str = "json") -> str:
+    return root + "".join("[*]" if key is None else _key_segment(key) for key in template)
+
+
+def _tree_events(obj: JSON_TYPE) -> Generator[Event, None, None]:
+    """The events ``JSONEventReader`` yields for ``obj``, for values that are already parsed."""
+    root: Iterator[tuple[str | None, JSON_TYPE]] = iter(((None, obj),))
+    stack = [(END_ARRAY, root)]
+    while stack:
+        end, children = stack[-1]
+        for key, value in children:
+            if key is not None:
+                yield MAP_KEY, key
+            if isinstance(value, dict):
+                yield START_MAP, None
+                stack.append((END_MAP, iter(value.items())))
+                break
+            if isinstance(value, list):
+                yield START_ARRAY, None
+                stack.append((END_ARRAY, ((None, v) for v in value)))
+                break
+            yield SCALAR, value
+        else:
+            stack.pop()
+            if stack:
+                yield end, None
+
+
+class PathStats:
+    """Counts for one path template: values seen per type and their min/max length."""
+
+    __slots__ = ("count", "max_length", "min_length", "types")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.types: dict[str, int] = {}
+        self.min_length: int | None = None
+        self.max_length: int | None = None
+
+    @property
+    def nulls(self) -> int:
+        return self.types.get("null", 0)
+
+    def _length(self, length: int | None) -> None:
+        if length is not None:
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = length if self.max_length is None else max(self.max_length, length)
+
+    def add(self, type_name: str, length: int | None = None) -> None:
+        self.count += 1
+        self.types[type_name] = self.types.get(type_name, 0) + 1
+        self._length(length)
+
+    def merge(self, other: PathStats) -> None:
+        self.count += other.count
+        for type_name, count in other.types.items():
+            self.types[type_name] = self.types.get(type_name, 0) + count
+        self._length(other.min_length)
+        self._length(other.max_length)
+
+    def __str__(self) -> str:
+        types = ",".join(f"{name}:{count}" for name, count in sorted(self.types.items()))
+        length = "" if self.min_length is None else f" length={self.min_length}..{self.max_length}"
+        return f"count={self.count} nulls={self.nulls} types={types}{length}"
+
+
+class SchemaStats:
+    """
+    Statistics per path template (array indices replaced by ``[*]``).
+
+    Values are added from a stream of parser events, so memory grows with the number of distinct
+    templates and the nesting depth, not with the size of the document. Lengths are the character
+    count of strings and the size of arrays and objects. Instances built on separate parts of the
+    input (NDJSON records) are combined with ``merge``.
+    """
+
+    def __init__(self) -> None:
+        self.paths: dict[Template, PathStats] = {}
+
+    def _add(self, template: Template, type_name: str, length: int | None) -> None:
+        stats = self.paths.get(template)
+        if stats is None:
+            stats = self.paths[template] = PathStats()
+        stats.add(type_name, length)
+
+    def add_events(self, events: Iterable[Event], template: Template = ()) -> None:
+        """Add the value described by ``events``, located at ``template``."""
+        # Template, size and type name of each open container.
+        stack: list[list[Any]] = []
+        key: str | None = None
+        for kind, value in events:
+            if kind == MAP_KEY:
+                key = value
+                continue
+            if kind in (END_MAP, END_ARRAY):
+                container_template, size, type_name = stack.pop()
+                self._add(container_template, type_name, size)
+                continue
+            if stack:
+                parent = stack[-1]
+                parent[1] += 1
+                template = (*parent[0], None if parent[2] == "array" else key)
+            if kind == START_MAP:
+                stack.append([template, 0, "object"])
+            elif kind == START_ARRAY:
+                stack.append([template, 0, "array"])
+            else:
+                self._add(
+                    template, _type_name(value), len(value) if isinstance(value, str) else None
+                )
+
+    def add_value(self, obj: JSON_TYPE, template: Template = ()) -> None:
+        self.add_events(_tree_events(obj), template)
+
+    def merge(self, other: SchemaStats) -> None:
+        for template, stats in other.paths.items():
+            if template in self.paths:
+                self.paths[template].merge(stats)
+            else:
+                self.paths[template] = stats
+
+    def lines(self, root: str = "json") -> Generator[str, None, None]:
+        """One line per template, in canonical order: ``json.items[*].id count=... types=...``."""
+        for template in sorted(self.paths, key=_template_order):
+            yield f"{render_template(template, root)} {self.paths[template]}"
+
+    def frequency_lines(self, root: str = "json") -> Generator[str, None, None]:
+        """``json.items[*].tags[*] : 1,204,332 (string)`` per template, most frequent first."""
+        templates = sorted(self.paths, key=_template_order)
+        templates.sort(key=lambda template: self.paths[template].count, reverse=True)
+        for template in templates:
+            stats = self.paths[template]
+            types = "|".join(sorted(stats.types))
+            yield f"{render_template(template, root)} : {stats.count:,} ({types})"
+
+    def json_schema(self) -> dict[str, Any]:
+        """
+        JSON Schema of the templates: observed types, object properties and array items.
+
+        A key is required when it was present in every object at its parent template.
+        """
+        nodes: dict[Template, dict[str, Any]] = {}
+        for template in sorted(self.paths, key=_template_order):
+            stats = self.paths[template]
+            types = sorted(stats.types)
+            node = nodes[template] = {"type": types[0] if len(types) == 1 else types}
+            if not template:
+                continue
+            parent = nodes[template[:-1]]
+            key = template[-1]
+            if key is None:
+                parent["items"] = node
+                continue
+            parent.setdefault("properties", {})[key] = node
+            if stats.count == self.paths[template[:-1]].types.get("object"):
+                parent.setdefault("required", []).append(key)
+        return {"$schema": JSON_SCHEMA, **nodes.get((), {})}
+
+
+def _template_order(template: Template) -> tuple[tuple[int, str], ...]:
+    # Same order as canonical gron output: [*] (array items) sorts before object keys.
+    return tuple((0, "") if key is None else (1, key) for key in template)
+
+
+def _record_stats(chunk: _Chunk) -> SchemaStats:
+    _, records, _, loads = chunk
+    stats = SchemaStats()
+    for record in records:
+        stats.add_value(loads(record), (None,))
+    return stats
+
+
+def ndjson_stats(
+    lines: Iterable[str],
+    *,
+    jobs: int = 0,
+    chunk_lines: int = DEFAULT_CHUNK_LINES,
+    loads: Callable[[str], Any] = json.loads,
+) -> SchemaStats:
+    """
+    Statistics of JSON Lines input as a top-level array (records under ``json[*]``).
+
+    Chunks of records are summarized by ``jobs`` worker processes and merged.
+    """
+    stats = SchemaStats()
+    records = 0
+    chunks = _chunk_records(lines, chunk_lines, None, loads)
+    for chunk_stats in ordered_map(_record_stats, chunks, jobs):
+        records += chunk_stats.paths[(None,)].count
+        stats.merge(chunk_stats)
+    stats.paths.setdefault((), PathStats()).add("array", records)
+    return stats
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import re
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from typing import Any
+from typing import TYPE_CHECKING
+
+from typing_extensions import TypeAlias
+
+from gron import _key_segment
+from gron import _scalar_value
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from typing import IO
+    from gron.path_filter import PathFilter
+    from gron.path_filter import State
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+START_MAP = "start_map"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+MAP_KEY = "map_key"
+SCALAR = "scalar"
+
+Event: TypeAlias = tuple[str, Any]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = re.compile(r"[-+.eE0-9]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+
+# Parser states
+_VALUE = 0
+_VALUE_OR_END = 1
+_KEY = 2
+_KEY_OR_END = 3
+_COLON = 4
+_COMMA_OR_END = 5
+_DONE = 6
+
+
+class JSONEventReader:
+    """
+    Incremental JSON tokenizer.
+
+    Reads ``fp`` in chunks and yields ``(kind, value)`` events. Only the current chunk and the
+    stack of open containers are kept in memory, so memory is bounded by nesting depth (and the
+    largest single scalar) rather than by document size.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+        self._containers: list[str] = []
+        self._state = _VALUE
+
+    @property
+    def depth(self) -> int:
+        return len(self._containers)
+
+    def __iter__(self) -> JSONEventReader:
+        return self
+
+    def _error(self, msg: str) -> ValueError:
+        msg = f"{msg} at offset {self._offset + self._pos}"
+        return ValueError(msg)
+
+    def _fill(self, size: int = 0) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fp.read(max(size, self._chunk_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        if self._pos < len(self._buf) and self._buf[self._pos] not in " \t\n\r":
+            return self._buf[self._pos]
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _scan_string(self) -> str | None:
+        try:
+            value, self._pos = scanstring(self._buf, self._pos + 1)
+        except ValueError:
+            return None
+        return value
+
+    def _read_string(self) -> str:
+        while True:
+            value = self._scan_string()
+            if value is not None:
+                return value
+            # Either the string continues in the next chunk or it is malformed.
+            if not self._fill(len(self._buf) - self._pos):
+                msg = "Invalid or unterminated string"
+                raise self._error(msg)
+
+    def _read_scalar(self, char: str) -> Any:  # noqa: ANN401
+        if char == '"':
+            return self._read_string()
+        if char == "-" or char.isdigit():
+            match = _NUMBER_CHARS.match(self._buf, self._pos)
+            while match.end() == len(self._buf) and self._fill():  # type: ignore[union-attr]
+                match = _NUMBER_CHARS.match(self._buf, self._pos)
+            text = match.group()  # type: ignore[union-attr]
+            if not _NUMBER.fullmatch(text):
+                msg = f"Invalid number {text!r}"
+                raise self._error(msg)
+            self._pos += len(text)
+            return float(text) if any(c in text for c in ".eE") else int(text)
+        if char in _LITERALS:
+            word, value = _LITERALS[char]
+            while len(self._buf) - self._pos < len(word) and self._fill():
+                pass
+            if self._buf.startswith(word, self._pos):
+                self._pos += len(word)
+                return value
+        msg = f"Unexpected character {char!r}"
+        raise self._error(msg)
+
+    def _close(self, kind: str) -> Event:
+        self._pos += 1
+        self._containers.pop()
+        self._state = _COMMA_OR_END if self._containers else _DONE
+        return kind, None
+
+    def skip(self) -> None:
+        """
+        Skip the rest of the innermost open container, up to and including its closing bracket.
+
+        Only brackets and string boundaries are scanned: nothing inside is decoded or validated.
+        """
+        if not self._containers:
+            msg = "No open container to skip"
+            raise ValueError(msg)
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    msg = "Unexpected end of JSON input"
+                    raise self._error(msg)
+                continue
+            char = match.group()
+            self._pos = match.start()
+            if char == '"':
+                end = _STRING_REST.match(self._buf, self._pos + 1)
+                if end is None:
+                    # The string continues in the next chunk.
+                    if not self._fill(len(self._buf) - self._pos):
+                        msg = "Invalid or unterminated string"
+                        raise self._error(msg)
+                    continue
+                self._pos = end.end()
+            elif char in "[{":
+                depth += 1
+                self._pos += 1
+            elif depth:
+                depth -= 1
+                self._pos += 1
+            else:
+                self._close(END_MAP)
+                return
+
+    def __next__(self) -> Event:  # noqa: C901, PLR0911, PLR0912
+        while True:
+            char = self._peek()
+            state = self._state
+            if state == _DONE:
+                if char:
+                    msg = "Extra data"
+                    raise self._error(msg)
+                raise StopIteration
+            if not char:
+                msg = "Unexpected end of JSON input"
+                raise self._error(msg)
+            if state == _COMMA_OR_END:
+                in_map = self._containers[-1] == "{"
+                if char == ",":
+                    self._pos += 1
+                    self._state = _KEY if in_map else _VALUE
+                    continue
+                if char == ("}" if in_map else "]"):
+                    return self._close(END_MAP if in_map else END_ARRAY)
+                msg = "Expecting ',' delimiter"
+                raise self._error(msg)
+            if state == _COLON:
+                if char != ":":
+                    msg = "Expecting ':' delimiter"
+                    raise self._error(msg)
+                self._pos += 1
+                self._state = _VALUE
+                continue
+            if state in (_KEY, _KEY_OR_END):
+                if char == "}" and state == _KEY_OR_END:
+                    return self._close(END_MAP)
+                if char != '"':
+                    msg = "Expecting property name enclosed in double quotes"
+                    raise self._error(msg)
+                key = self._read_string()
+                self._state = _COLON
+                return MAP_KEY, key
+            if char == "]" and state == _VALUE_OR_END:
+                return self._close(END_ARRAY)
+            if char == "{":
+                self._pos += 1
+                self._containers.append(char)
+                self._state = _KEY_OR_END
+                return START_MAP, None
+            if char == "[":
+                self._pos += 1
+                self._containers.append(char)
+                self._state = _VALUE_OR_END
+                return START_ARRAY, None
+            value = self._read_scalar(char)
+            self._state = _COMMA_OR_END if self._containers else _DONE
+            return SCALAR, value
+
+
+def stream_gron(  # noqa: C901, PLR0912, PLR0913, PLR0915
+    fp: IO[str],
+    path: str = "json",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    path_filter: PathFilter | None = None,
+    *,
+    stop_early: bool = False,
+    max_depth: int | None = None,
+    max_items: int | None = None,
+) -> Generator[str, None, None]:
+    """
+    Gron ``fp`` while reading it. Lines follow document order instead of sorted order.
+
+    With ``stop_early`` and an exact ``path_filter``, reading stops as soon as the matching node's
+    subtree has been emitted, or once the branch that could contain it has been closed.
+
+    Containers ``max_depth`` levels below the root are printed as ``{}``/``[]`` and arrays stop
+    after ``max_items`` elements; the parts left out are only scanned for their closing bracket.
+    """
+    if stop_early and (path_filter is None or not path_filter.exact):
+        msg = "stop_early needs an exact path filter"
+        raise ValueError(msg)
+    segments = [path]
+    # -1 for objects, otherwise the next index of the array.
+    counters: list[int] = []
+    # Filter state of each open container; None below a pruned node.
+    states: list[State] = []
+    # Index in states of the first container that matched, for stop_early.
+    matched_at = -1
+    key: str | int = ""
+    reader = JSONEventReader(fp, chunk_size)
+    for kind, value in reader:
+        if kind == MAP_KEY:
+            key = value
+            continue
+        if (
+            max_items is not None
+            and counters
+            and counters[-1] >= max_items
+            and kind not in (END_MAP, END_ARRAY)
+        ):
+            # First element past the limit: skip it (if it is a container), then the rest.
+            if kind != SCALAR:
+                reader.skip()
+            reader.skip()
+            kind = END_ARRAY  # noqa: PLW2901
+        if kind in (END_MAP, END_ARRAY):
+            counters.pop()
+            segments.pop()
+            state = states.pop()
+            # Closing a node on the query path is final unless it sits inside the matched subtree.
+            if stop_early and state is not None and (matched_at < 0 or matched_at == len(states)):
+                return
+            continue
+        if counters and counters[-1] >= 0:
+            key = counters[-1]
+            counters[-1] += 1
+        if not counters:
+            segment = ""
+            state = path_filter.start(path) if path_filter else None
+        else:
+            segment = f"[{key}]" if isinstance(key, int) else _key_segment(key)
+            state = path_filter.step(states[-1], key) if path_filter else None
+        if kind == SCALAR:
+            line_path = f"{''.join(segments)}{segment}"
+            if path_filter is None or path_filter.matches(state, line_path):
+                yield f"{line_path} = {_scalar_value(value)};"
+                if stop_early and matched_at < 0:
+                    return
+            continue
+        is_map = kind == START_MAP
+        if max_depth is not None and len(counters) >= max_depth:
+            line_path = f"{''.join(segments)}{segment}"
+            if path_filter is None or path_filter.matches(state, line_path):
+                yield f"{line_path} = {'{}' if is_map else '[]'};"
+            reader.skip()
+            continue
+        segments.append(segment)
+        states.append(state)
+        counters.append(-1 if is_map else 0)
+        line_path = "".join(segments)
+        if path_filter is None or path_filter.matches(state, line_path):
+            if matched_at < 0:
+                matched_at = len(states) - 1
+            yield f"{line_path} = {'{}' if is_map else '[]'};"
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable
+from typing import TYPE_CHECKING
+
+from gron import iter_gron
+from gron.diff import diff_gron
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from gron import JSON_TYPE
+    from gron.path_filter import PathFilter
+
+
+DEFAULT_INTERVAL = 1.0
+
+
+def watch_gron(
+    filename: str,
+    load: Callable[[str], JSON_TYPE],
+    *,
+    interval: float = DEFAULT_INTERVAL,
+    path_filter: PathFilter | None = None,
+) -> Generator[list[tuple[str, str]], None, None]:
+    """
+    Yield the ``diff_gron`` changes of ``filename`` each time it is rewritten.
+
+    The mtime is polled every ``interval`` seconds and the first batch adds every line of the
+    initial document; a file that is missing or invalid at the start raises right away. Only the
+    previous gron lines are kept; a file caught half written is read again on the next poll.
+    """
+    mtime = os.stat(filename).st_mtime_ns
+    previous = list(iter_gron(load(filename), path_filter))
+    yield list(diff_gron([], previous))
+    while True:
+        time.sleep(interval)
+        try:
+            current = os.stat(filename).st_mtime_ns
+        except FileNotFoundError:
+            # Replaced by a rename, the new file shows up on a later poll.
+            continue
+        if current == mtime:
+            continue
+        try:
+            obj = load(filename)
+        except ValueError:
+            continue
+        mtime = current
+        lines = list(iter_gron(obj, path_filter))
+        changes = list(diff_gron(previous, lines))
+        previous = lines
+        if changes:
+            yield changes
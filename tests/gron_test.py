@@ -1,15 +1,61 @@
 # flake8: noqa: PLW1510
 from __future__ import annotations
 
+import bz2
+import gzip
+import io
 import json
+import lzma
+import os
 import subprocess
+import sys
+import threading
+import time
+from typing import Any
+from typing import TYPE_CHECKING
 
 import pytest
+from gron import expand_front_coded
+from gron import front_code
 from gron import gron
+from gron import gron_to_json
+from gron import iter_gron
+from gron import iter_gron_json
+from gron import iter_gron_limited
 from gron import JSON_TYPE
 from gron import ungron
+from gron import ungron_elements
+from gron.__main__ import _find_lines
+from gron.__main__ import _json_files
+from gron.__main__ import _write_lines
+from gron.__main__ import Gron
+from gron.backends import _has_wide_int
+from gron.backends import available_backends
+from gron.backends import loads_function
+from gron.backends import select_backend
+from gron.backends import STREAM_THRESHOLD
+from gron.columnar import iter_columnar
+from gron.compression import open_input
+from gron.diff import diff_gron
+from gron.external_sort import external_sort
+from gron.index import GronIndex
+from gron.index import index_json
+from gron.parallel import gron_files
+from gron.parallel import gron_ndjson
+from gron.patch import apply_patch
+from gron.path_filter import PathFilter
+from gron.stats import ndjson_stats
+from gron.stats import SchemaStats
+from gron.stream import JSONEventReader
+from gron.stream import stream_gron
+from gron.watch import watch_gron
 from runtool import RUNTOOL_CONFIG
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Generator
+    from pathlib import Path
+
 GRON_PROVIDER = RUNTOOL_CONFIG["gron"]
 
 
@@ -238,6 +284,30 @@ def test_gron(obj: JSON_TYPE) -> None:
     assert sorted(actual) == sorted(expected)
 
 
+def test_gron_canonical_order() -> None:
+    actual = gron({"b": list(range(11)), "a": {"d": None, "c": True}})
+    assert actual == [
+        "json = {};",
+        "json.a = {};",
+        "json.a.c = true;",
+        "json.a.d = null;",
+        "json.b = [];",
+        *(f"json.b[{i}] = {i};" for i in range(11)),
+    ]
+
+
+def test_gron_deep() -> None:
+    depth = 5_000
+    obj: list[Any] = []
+    node = obj
+    for _ in range(depth):
+        node.append({"a": []})
+        node = node[-1]["a"]
+    lines = gron(obj)
+    assert len(lines) == 2 * depth + 1
+    assert lines[-1] == f"json{'[0].a' * depth} = [];"
+
+
 @pytest.mark.parametrize(
     "original",
     (
@@ -272,3 +342,607 @@ def test_ungron(original: list[str]) -> None:
         print("expected:")
         print(expected_str)
         raise
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+@pytest.mark.parametrize("obj", objs)
+def test_stream_gron(obj: str, chunk_size: int) -> None:
+    actual = stream_gron(io.StringIO(obj), chunk_size=chunk_size)
+    assert sorted(actual) == sorted(gron(json.loads(obj)))
+
+
+def test_stream_gron_deep() -> None:
+    depth = 10_000
+    lines = list(stream_gron(io.StringIO("[" * depth + "1" + "]" * depth)))
+    assert len(lines) == depth + 1
+    assert lines[-1] == f"json{'[0]' * depth} = 1;"
+
+
+@pytest.mark.parametrize("obj", ['{"a": 1,}', "[1 2]", '{"a" 1}', "[1", "[1]]", "01", '"abc'])
+def test_stream_gron_invalid(obj: str) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(stream_gron(io.StringIO(obj), chunk_size=2))
+
+
+@pytest.mark.parametrize("run_lines", [1, 5, 1_000_000])
+def test_external_sort(tmp_path: Path, run_lines: int) -> None:
+    lines = [line for obj in objs for line in gron(json.loads(obj))]
+    actual = list(external_sort(lines, run_lines=run_lines, temp_dir=str(tmp_path)))
+    assert actual == sorted(lines)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("order", [list, sorted])
+@pytest.mark.parametrize("obj", [*(json.loads(s) for s in objs), {"a b": ['x"y', 1.5, [], {}]}])
+def test_ungron_roundtrip(obj: JSON_TYPE, order: Callable[[list[str]], list[str]]) -> None:
+    assert ungron(order(gron(obj))) == obj
+
+
+@pytest.mark.parametrize("lines", [["json.a = 1;"], ["json = {};", "json.a.b = 1;"], ["bad"], []])
+def test_ungron_invalid(lines: list[str]) -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        ungron(lines)
+
+
+@pytest.mark.parametrize("obj", [json.loads(s) for s in objs])
+def test_ungron_merge_unordered(obj: JSON_TYPE) -> None:
+    lines = gron(obj)
+    assert ungron(reversed(lines), merge=True) == obj
+    shards = [line for line in lines if "[" in line], [line for line in lines if "[" not in line]
+    assert ungron((line for shard in shards for line in shard), merge=True) == obj
+
+
+@pytest.mark.parametrize(
+    ("lines", "message"),
+    [
+        ("json = {};\njson.a[0].b = 1;\n", "gron: Missing parent for ['a', 0, 'b'], use --merge"),
+        ("json = {};\nnonsense\n", "gron: Invalid gron line: 'nonsense'"),
+    ],
+)
+def test_ungron_error(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    lines: str,
+    message: str,
+) -> None:
+    filename = tmp_path / "in.gron"
+    filename.write_text(lines)
+    assert Gron.run(["--file", str(filename), "--ungron"]) > 1
+    assert capsys.readouterr().err.startswith(message)
+
+
+def test_ungron_merge_partial() -> None:
+    lines = ['json.a[2].b = "x";', "json.c = 1;", 'json.a[0] = "y";']
+    assert ungron(lines, merge=True) == {"a": ["y", None, {"b": "x"}], "c": 1}
+
+
+def test_ungron_elements() -> None:
+    obj = [{"a": i, "b": [i, None]} for i in range(12)] + [3, "x"]
+    assert list(ungron_elements(gron(obj))) == obj
+    assert list(ungron_elements(line for line in gron(obj) if "[5]" not in line)) == [
+        *obj[:5],
+        *obj[6:],
+    ]
+    with pytest.raises(ValueError, match="not in canonical order"):
+        list(ungron_elements(sorted(gron(obj))))
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(ungron_elements(gron({"a": 1})))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_gron_ndjson(jobs: int) -> None:
+    records = [json.loads(obj) for obj in objs] * 3
+    ndjson = [json.dumps(record) + "\n" for record in records]
+    actual = list(gron_ndjson(["\n", *ndjson], jobs=jobs, chunk_lines=2))
+    assert actual == gron(records)
+    assert list(ungron_elements(actual)) == records
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("json.menu.items[*].label", 12),
+        ("json.menu.items[1?].id", 8),
+        ("json.**.header", 1),
+        ('json["menu"].items[2]', 1),
+        ("json.menu.items[1]", 3),
+        (r"json.menu.items\[.*\].label", 12),
+        ("json.missing", 0),
+        ("label", 12),
+        ("header", 1),
+    ],
+)
+def test_gron_path_filter(pattern: str, expected: int) -> None:
+    lines = gron(json.loads(obj5))
+    actual = list(iter_gron(json.loads(obj5), PathFilter(pattern)))
+    assert len(actual) == expected
+    assert set(actual) <= set(lines)
+    assert sorted(stream_gron(io.StringIO(obj5), path_filter=PathFilter(pattern))) == sorted(actual)
+
+
+@pytest.mark.parametrize("pattern", ["json.a[", "(", "items[*"])
+def test_gron_path_filter_invalid(pattern: str) -> None:
+    with pytest.raises(ValueError, match="Invalid path pattern"):
+        PathFilter(pattern)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("json.meta.version", ["json.meta.version = 3;"]),
+        ("json.meta", ["json.meta = {};", "json.meta.version = 3;"]),
+        ("json.meta.missing", []),
+        ("json.data[1]", ["json.data[1] = 1;"]),
+    ],
+)
+def test_stream_gron_stop_early(query: str, expected: list[str]) -> None:
+    fp = io.StringIO('{"meta": {"version": 3}, "data": [' + "1, " * 100_000 + "1]}")
+    chunk_size = 64
+    actual = stream_gron(fp, chunk_size=chunk_size, path_filter=PathFilter(query), stop_early=True)
+    assert list(actual) == expected
+    assert fp.tell() < 16 * chunk_size
+
+
+@pytest.mark.parametrize("flush_each", [False, True])
+def test_write_lines(monkeypatch: pytest.MonkeyPatch, flush_each: bool) -> None:  # noqa: FBT001
+    buffer = io.BytesIO()
+    monkeypatch.setattr("sys.stdout", io.TextIOWrapper(buffer, encoding="utf-8"))
+    monkeypatch.setattr("gron.__main__.OUTPUT_BLOCK_SIZE", 5)
+    written: list[bytes] = []
+
+    def lines() -> Generator[str, None, None]:
+        for i in range(5):
+            written.append(buffer.getvalue())
+            yield f"line {i} é"
+
+    assert _write_lines(lines(), flush_each=flush_each) == len(written)
+    assert buffer.getvalue().decode() == "".join(f"line {i} é\n" for i in range(5))
+    # Blocks of 5 characters hold one line each, so each line is out before the next is made.
+    assert written[1:] == [
+        b"".join(b"line %d \xc3\xa9\n" % j for j in range(i)) for i in range(1, 5)
+    ]
+
+
+def test_write_lines_broken_pipe(tmp_path: Path) -> None:
+    filename = tmp_path / "big.json"
+    filename.write_text(json.dumps(list(range(1_000_000))))
+    with subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "gron", "--file", str(filename)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as process:
+        assert process.stdout is not None
+        assert process.stderr is not None
+        assert process.stdout.readline() == b"json = [];\n"
+        process.stdout.close()
+        assert process.stderr.read() == b""
+    assert process.returncode == 1
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("json.meta.version", 0),
+        ("json.meta.missing", 1),
+    ],
+)
+def test_query_exit_code(tmp_path: Path, query: str, expected: int) -> None:
+    filename = tmp_path / "in.json"
+    filename.write_text('{"meta": {"version": 3}}')
+    assert Gron.run(["--file", str(filename), "--query", query]) == expected
+
+
+def test_index(tmp_path: Path) -> None:
+    obj = json.loads(obj4)
+    filename = str(tmp_path / "out.gidx")
+    lines = gron(obj)
+    assert index_json(filename, obj) == len(lines)
+    with GronIndex(filename) as index:
+        assert sorted(index.subtree("json")) == sorted(lines)
+        for line in lines:
+            path, value = line[:-1].split(" = ", 1)
+            assert index.get(path) == value
+        servlet = [line for line in lines if line.startswith('json["web-app"].servlet[')]
+        assert sorted(index.subtree('json["web-app"].servlet[0]')) == sorted(
+            line for line in servlet if line.startswith('json["web-app"].servlet[0]')
+        )
+        assert index.get("json.missing") is None
+        assert list(index.subtree("json.missing")) == []
+
+
+@pytest.mark.parametrize("args", [["--path", "json.a"], ["--max-depth", "1"]])
+def test_index_whole_document(tmp_path: Path, args: list[str]) -> None:
+    filename = tmp_path / "in.json"
+    filename.write_text('{"a": 1, "b": 2}')
+    with pytest.raises(SystemExit, match="2"):
+        Gron.run(["--file", str(filename), "--index", str(tmp_path / "out.gidx"), *args])
+    assert not (tmp_path / "out.gidx").exists()
+
+
+def test_index_values(tmp_path: Path) -> None:
+    obj = json.loads(obj5)
+    filename = str(tmp_path / "out.gidx")
+    index_json(filename, obj, values=True)
+    with GronIndex(filename) as index:
+        assert sorted(index.find('"Open"')) == ["json.menu.items[0].id"]
+        assert len(list(index.find("null"))) == obj5.count("null")
+        assert list(index.find('"missing"')) == []
+        assert list(index.find("{}")) == []
+
+
+def test_find_lines(tmp_path: Path) -> None:
+    filename = str(tmp_path / "out.gidx")
+    index_json(filename, {"b": "42", "a": 42, "c": 43}, values=True)
+    with GronIndex(filename) as index:
+        assert list(_find_lines(index, "42")) == ['json.b = "42";', "json.a = 42;"]
+        assert list(_find_lines(index, '"42"')) == ['json.b = "42";']
+
+
+def test_index_values_stale(tmp_path: Path) -> None:
+    filename = str(tmp_path / "out.gidx")
+    index_json(filename, {"a": "x"}, values=True)
+    stale = (tmp_path / "out.gidx.values").read_bytes()
+    index_json(filename, {"a": "y"})
+    assert not (tmp_path / "out.gidx.values").exists()
+    with GronIndex(filename) as index, pytest.raises(ValueError, match="without"):
+        list(index.find('"y"'))
+    (tmp_path / "out.gidx.values").write_bytes(stale)
+    with GronIndex(filename) as index:
+        assert index.get("json.a") == '"y"'
+        with pytest.raises(ValueError, match="another"):
+            list(index.find('"x"'))
+
+
+def test_diff_gron() -> None:
+    old = {"a": 1, "b": [1, 2, 3], "c": {"d": "x"}, "e": None}
+    new = {"a": 1, "b": [1, 5], "c": [], "f": True}
+    assert list(diff_gron(iter_gron(old), iter_gron(new))) == [
+        ("-", "json.b[1] = 2;"),
+        ("+", "json.b[1] = 5;"),
+        ("-", "json.b[2] = 3;"),
+        ("-", "json.c = {};"),
+        ("+", "json.c = [];"),
+        ("-", 'json.c.d = "x";'),
+        ("-", "json.e = null;"),
+        ("+", "json.f = true;"),
+    ]
+    for s in objs:
+        obj = json.loads(s)
+        assert list(diff_gron(iter_gron(obj), iter_gron(obj))) == []
+        assert [line for _, line in diff_gron([], iter_gron(obj))] == gron(obj)
+
+
+@pytest.mark.parametrize("compress", [bytes, gzip.compress, bz2.compress, lzma.compress])
+def test_open_input(tmp_path: Path, compress: Callable[[bytes], bytes]) -> None:
+    filename = tmp_path / "in.json"
+    filename.write_bytes(compress(obj5.encode()))
+    with open_input(str(filename)) as f:
+        assert json.load(f) == json.loads(obj5)
+
+
+@pytest.mark.parametrize("compress", [bytes, gzip.compress, bz2.compress, lzma.compress])
+def test_open_input_pipe(compress: Callable[[bytes], bytes]) -> None:
+    data = compress(obj5.encode())
+    read_fd, write_fd = os.pipe()
+
+    def write() -> None:
+        # The magic bytes arrive in two writes, as from a slow producer.
+        with os.fdopen(write_fd, "wb", buffering=0) as f:
+            f.write(data[:1])
+            time.sleep(0.1)
+            f.write(data[1:])
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        with open_input(f"/dev/fd/{read_fd}") as f:
+            assert json.load(f) == json.loads(obj5)
+    finally:
+        writer.join()
+        os.close(read_fd)
+
+
+def test_select_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("GRON_BACKEND", raising=False)
+    assert select_backend("json") == "json"
+    assert select_backend(size=STREAM_THRESHOLD, streaming=True) == "stream"
+    assert select_backend(size=STREAM_THRESHOLD) in ("json", "orjson")
+    with pytest.raises(ValueError, match="cannot be used here"):
+        select_backend("stream")
+    with pytest.raises(ValueError, match="Unknown"):
+        select_backend("simdjson")
+    monkeypatch.setenv("GRON_BACKEND", "json")
+    assert select_backend(size=STREAM_THRESHOLD, streaming=True) == "json"
+    monkeypatch.setenv("GRON_BACKEND", "stream")
+    assert select_backend() in ("json", "orjson")
+    for backend in available_backends():
+        if backend != "stream":
+            loads = loads_function(backend)
+            big = "[123456789012345678901234567890, -9223372036854775809]"
+            for s in [*objs, "[NaN, Infinity]", big]:
+                assert gron(loads(s)) == gron(json.loads(s))
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("[123456789012345678901234567890]", True),
+        ('{"a": -9223372036854775809}', True),
+        ("[18446744073709551616]", True),
+        ("[18446744073709551615, -9223372036854775808]", False),
+        ('{"ts": 1700000000123456789}', False),
+        ('{"id": "123456789012345678901234567890"}', False),
+        ("[0.123456789012345678901234567890, 1234567890123456789012e5]", False),
+    ],
+)
+def test_has_wide_int(text: str, expected: bool) -> None:  # noqa: FBT001
+    assert _has_wide_int(text) is expected
+
+
+def test_watch_gron(tmp_path: Path) -> None:
+    filename = tmp_path / "status.json"
+    filename.write_text('{"a": 1, "b": 2}')
+
+    def load(name: str) -> JSON_TYPE:
+        with open(name) as f:
+            return json.load(f)
+
+    changes = watch_gron(str(filename), load, interval=0)
+    assert next(changes) == [("+", "json = {};"), ("+", "json.a = 1;"), ("+", "json.b = 2;")]
+    filename.write_text('{"a": 1, "b": 3}')
+    os.utime(filename, ns=(0, 1))
+    assert next(changes) == [("-", "json.b = 2;"), ("+", "json.b = 3;")]
+    with pytest.raises(FileNotFoundError):
+        next(watch_gron(str(tmp_path / "missing.json"), load, interval=0))
+
+
+@pytest.mark.parametrize("s", objs)
+def test_gron_json(s: str) -> None:
+    obj = json.loads(s)
+    lines = list(iter_gron_json(obj))
+    assert lines == [gron_to_json(line) for line in gron(obj)]
+    assert json.loads(lines[0])[0] == []
+    assert ungron(lines) == obj
+    path_filter = PathFilter("json.**")
+    assert list(iter_gron_json(obj, path_filter)) == lines
+    elements = [gron_to_json(line) for line in gron_ndjson([s, s])]
+    assert list(ungron_elements(elements)) == [obj, obj]
+    with pytest.raises(ValueError, match="top-level array element"):
+        list(ungron_elements(iter_gron_json({"a": {"x": 1}, "b": 2})))
+
+
+def test_gron_non_finite() -> None:
+    obj = json.loads("[NaN, Infinity, -Infinity, 1.5]")
+    lines = gron(obj)
+    assert lines[1:] == [
+        "json[0] = NaN;",
+        "json[1] = Infinity;",
+        "json[2] = -Infinity;",
+        "json[3] = 1.5;",
+    ]
+    assert json.dumps(ungron(lines)) == json.dumps(obj)
+    json_lines = list(iter_gron_json(obj))
+    assert [
+        json.dumps(json.loads(line), separators=(",", ":")) for line in json_lines
+    ] == json_lines
+    assert json.dumps(ungron(json_lines)) == json.dumps(obj)
+
+
+def test_iter_columnar() -> None:
+    obj = {
+        "items": [
+            {"id": 1, "name": "a,b", "tags": ["x"]},
+            {"id": "2", "name": "null", "tags": None},
+        ],
+        "meta": {"rows": [{"n": 1}]},
+        "other": [1, {"n": 2}],
+    }
+    assert list(iter_columnar(obj)) == [
+        "json.items,id,name,tags",
+        '0,1,"a,b","[""x""]"',
+        "1,2,null,null",
+        "",
+        "json.meta.rows,n",
+        "0,1",
+    ]
+    assert list(iter_columnar(obj, delimiter="\t"))[1] == '0\t1\ta,b\t"[""x""]"'
+    assert list(iter_columnar({"a": [1, 2]})) == []
+
+
+def test_schema_stats() -> None:
+    obj = {"items": [{"id": 1, "tags": ["a", "bcd"]}, {"id": None}], "name": "x"}
+    stats = SchemaStats()
+    stats.add_events(JSONEventReader(io.StringIO(json.dumps(obj))))
+    assert list(stats.lines()) == [
+        "json count=1 nulls=0 types=object:1 length=2..2",
+        "json.items count=1 nulls=0 types=array:1 length=2..2",
+        "json.items[*] count=2 nulls=0 types=object:2 length=1..2",
+        "json.items[*].id count=2 nulls=1 types=integer:1,null:1",
+        "json.items[*].tags count=1 nulls=0 types=array:1 length=2..2",
+        "json.items[*].tags[*] count=2 nulls=0 types=string:2 length=1..3",
+        "json.name count=1 nulls=0 types=string:1 length=1..1",
+    ]
+    schema = stats.json_schema()
+    assert schema["required"] == ["items", "name"]
+    assert schema["properties"]["items"]["items"]["required"] == ["id"]
+    assert schema["properties"]["items"]["items"]["properties"]["id"]["type"] == [
+        "integer",
+        "null",
+    ]
+    for s in objs:
+        tree_stats = SchemaStats()
+        tree_stats.add_value(json.loads(s))
+        stream_stats = SchemaStats()
+        stream_stats.add_events(JSONEventReader(io.StringIO(s)))
+        assert list(tree_stats.lines()) == list(stream_stats.lines())
+    records = [json.dumps(obj)] * 5
+    merged = list(ndjson_stats(records, jobs=2, chunk_lines=2).lines())
+    assert merged[0] == "json count=1 nulls=0 types=array:1 length=5..5"
+    assert "json[*].items[*].id count=10 nulls=5 types=integer:5,null:5" in merged
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--stats", "--path", "json.b"],
+        ["--templates", "--max-depth", "1"],
+        ["--stats", "--max-items", "1"],
+        ["--stats", "--format", "json"],
+    ],
+)
+def test_stats_whole_document(tmp_path: Path, args: list[str]) -> None:
+    filename = tmp_path / "in.json"
+    filename.write_text('{"a": 1, "b": [2]}')
+    with pytest.raises(SystemExit, match="2"):
+        Gron.run(["--file", str(filename), *args])
+
+
+def test_frequency_lines() -> None:
+    stats = SchemaStats()
+    stats.add_value({"items": [{"tags": ["a", "b", 1]}, {"tags": ["c"]}], "z": None})
+    assert list(stats.frequency_lines()) == [
+        "json.items[*].tags[*] : 4 (integer|string)",
+        "json.items[*] : 2 (object)",
+        "json.items[*].tags : 2 (array)",
+        "json : 1 (object)",
+        "json.items : 1 (array)",
+        "json.z : 1 (null)",
+    ]
+    records = ['{"id": 1}'] * 1500
+    assert next(ndjson_stats(records, jobs=1).frequency_lines()) == "json[*] : 1,500 (object)"
+
+
+@pytest.mark.parametrize("s", objs)
+def test_gron_limited(s: str) -> None:
+    obj = json.loads(s)
+    assert list(iter_gron_limited(obj)) == gron(obj)
+    for max_depth, max_items in [(0, None), (1, None), (2, 1), (None, 0), (None, 2)]:
+        expected = list(iter_gron_limited(obj, max_depth=max_depth, max_items=max_items))
+        assert set(expected) <= set(gron(obj))
+        for chunk_size in (1, 7, 4096):
+            lines = stream_gron(
+                io.StringIO(s),
+                chunk_size=chunk_size,
+                max_depth=max_depth,
+                max_items=max_items,
+            )
+            assert sorted(lines) == sorted(expected)
+
+
+def test_gron_sample() -> None:
+    sample = 3
+    lines = list(iter_gron_limited({"a": list(range(100))}, sample=sample, seed=1))
+    assert len(lines) == len(["json = {};", "json.a = [];"]) + sample
+    assert set(lines) <= set(gron({"a": list(range(100))}))
+    assert lines == list(iter_gron_limited({"a": list(range(100))}, sample=sample, seed=1))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--max-items", "-1"],
+        ["--max-items", "-1", "--stream"],
+        ["--sample", "-2"],
+        ["--max-depth", "-1"],
+    ],
+)
+def test_gron_limited_negative(tmp_path: Path, args: list[str]) -> None:
+    filename = tmp_path / "in.json"
+    filename.write_text('{"a": [1, 2]}')
+    with pytest.raises(SystemExit, match="2"):
+        Gron.run(["--file", str(filename), *args])
+
+
+def test_apply_patch() -> None:
+    patch = [
+        'json.name = "new";',
+        "json.meta.tags[1] = true;",
+        "-json.old",
+        "-json.items[0] = 1;",
+        "-json.items[2];",
+        "-json.missing.x;",
+    ]
+    obj = {"name": "x", "old": 1, "items": [1, 2, 3, 4]}
+    assert apply_patch(obj, patch) == {
+        "name": "new",
+        "items": [2, 4],
+        "meta": {"tags": [None, True]},
+    }
+    for a, b in zip(objs, objs[1:]):
+        before, after = json.loads(a), json.loads(b)
+        diff = [sign + line for sign, line in diff_gron(iter_gron(before), iter_gron(after))]
+        assert apply_patch(before, diff) == after
+
+
+def test_apply_patch_cli(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    target = tmp_path / "config.json"
+    target.write_text('{"city": "Zürich", "n": 1}', encoding="utf-8")
+    patch = tmp_path / "patch.gron"
+    patch.write_text("json.n = 2;\n")
+    assert Gron.run(["--apply", str(patch), str(target)]) == 0
+    assert json.loads(capsys.readouterr().out) == {"city": "Zürich", "n": 2}
+    assert "Zürich" in target.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("line", ["-\n", "-foo\n", "-json.a b;", "-.a;", "-json[x] = 1;"])
+def test_apply_patch_invalid_delete(line: str) -> None:
+    with pytest.raises(ValueError, match="Invalid gron path"):
+        apply_patch({"a": 1}, [line])
+
+
+@pytest.mark.parametrize("s", objs)
+def test_front_code(s: str) -> None:
+    obj = json.loads(s)
+    lines = gron(obj)
+    coded = list(front_code(lines))
+    assert coded[0] == f"0 {lines[0]}"
+    assert sum(map(len, coded)) <= sum(map(len, lines)) + 2 * len(lines)
+    assert list(expand_front_coded(f"{line}\n" for line in coded)) == lines
+    assert ungron(coded) == obj
+    assert list(ungron_elements(front_code(gron_ndjson([s, s])))) == [obj, obj]
+
+
+def test_gron_files(tmp_path: Path) -> None:
+    filenames = []
+    for i, s in enumerate(objs):
+        filename = tmp_path / f"{i}.json"
+        filename.write_text(s)
+        filenames.append(str(filename))
+    expected = [
+        f"{name}:{line}" for name, s in zip(filenames, objs) for line in gron(json.loads(s))
+    ]
+    assert list(gron_files(filenames, jobs=1)) == expected
+    assert list(gron_files(filenames, jobs=2)) == expected
+    bad = tmp_path / "bad.json"
+    bad.write_text("{")
+    missing = str(tmp_path / "missing.json")
+    errors: list[str] = []
+    actual = gron_files([str(bad), *filenames, missing], jobs=2, on_error=errors.append)
+    assert list(actual) == expected
+    assert [error.split(": ")[0] for error in errors] == [str(bad), missing]
+    with pytest.raises(ValueError, match=r"bad\.json"):
+        list(gron_files([str(bad)], jobs=1))
+
+
+@pytest.mark.parametrize("args", [["--max-depth", "0"], ["--max-items", "1"], ["--sample", "1"]])
+def test_gron_files_limited(tmp_path: Path, args: list[str]) -> None:
+    (tmp_path / "a.json").write_text('{"a": [1, 2]}')
+    with pytest.raises(SystemExit, match="2"):
+        Gron.run(["--file", str(tmp_path), *args])
+
+
+def test_json_files(tmp_path: Path) -> None:
+    for name in ["b/2.json", "b/1.json.gz", "a/c/3.json", "a/notes.txt", "0.json"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("{}")
+    assert [os.path.relpath(name, tmp_path) for name in _json_files([str(tmp_path)])] == [
+        "0.json",
+        "a/c/3.json",
+        "b/1.json.gz",
+        "b/2.json",
+    ]
+    assert list(_json_files(["x.txt", str(tmp_path / "b")])) == [
+        "x.txt",
+        str(tmp_path / "b" / "1.json.gz"),
+        str(tmp_path / "b" / "2.json"),
+    ]